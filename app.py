@@ -1,23 +1,129 @@
 import asyncio
+import logging
+import threading
 from multiprocessing.spawn import freeze_support
+from typing import TYPE_CHECKING, Optional
 
-from app_factory import create_app, app_context, init_fast_mcp, run_mcp_server
-from nacos_mcp import NacosMCP
+from aduib_app import AduibAIApp
+from app_factory import create_app, create_app_with_configs, app_context, init_fast_mcp, run_mcp_server
+from component.log.app_logging import init_logging
+from configs import config
+from utils.rate_limit import set_serving_processes
+
+if TYPE_CHECKING:
+    from nacos_mcp import NacosMCP
+
+log = logging.getLogger(__name__)
+
+_app: Optional[AduibAIApp] = None
+
+
+def get_app() -> AduibAIApp:
+    """
+    build the app on first use. The parent of the worker processes never builds it, so it holds no
+    DB / Redis / HTTP pools and no background threads of its own.
+    """
+    global _app
+    if _app is None:
+        _app = app_context.get() or create_app()
+    return _app
+
+
+def __getattr__(name: str):
+    # ``from app import app`` builds the app on first access
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def create_worker_app():
+    """
+    uvicorn app factory of the worker processes (``app:create_worker_app``).
+    Workers are spawned, every one of them builds its own app, MCP server and DB / Redis / HTTP pools.
+    The node is registered to Nacos once by the parent process, every worker follows the tool metadata
+    (enabled flags, descriptions) kept in Nacos itself, as it serves the tool calls.
+    """
+    # the workers split the rate limits between them while redis is unavailable
+    set_serving_processes(_worker_count())
+    app = get_app()
+    app.extensions["nacos_tools_sync"] = _uses_nacos()
+    init_fast_mcp(app)
+    run_mcp_server(app)
+    return app
+
+
+def _uses_nacos() -> bool:
+    return config.DISCOVERY_SERVICE_ENABLED and config.DISCOVERY_SERVICE_TYPE == "nacos"
+
+
+def _register_service_in_background(mcp: "NacosMCP", transport: str):
+    """register the node to Nacos once from the parent process, on a loop kept running for its heartbeats"""
+    loop = asyncio.new_event_loop()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(mcp.register_service(transport))
+        except Exception as e:
+            log.error(f"Unable to register to nacos: {e}", exc_info=True)
+            return
+        loop.run_forever()
+
+    threading.Thread(target=run, name="nacos-registration", daemon=True).start()
+
+
+def _worker_count() -> int:
+    workers = config.APP_MAX_WORKERS
+    if workers <= 1:
+        return 1
+    # stateful MCP sessions live in the worker that created them, requests of a session may reach any worker
+    if config.TRANSPORT_TYPE != "streamable-http" or not config.MCP_STATELESS_HTTP:
+        log.warning(
+            f"APP_MAX_WORKERS={workers} needs the streamable-http transport with MCP_STATELESS_HTTP, "
+            f"serving with a single worker"
+        )
+        return 1
+    return workers
 
-app=None
-if not app_context.get():
-    app=create_app()
 
 async def main(**kwargs):
+    app = get_app()
     init_fast_mcp(app)
     import uvicorn
     config = uvicorn.Config(app=app, host=app.config.APP_HOST, port=app.config.APP_PORT, **kwargs)
-    if isinstance(app.mcp,NacosMCP):
+    if _uses_nacos():
         await app.mcp.register_service(app.config.TRANSPORT_TYPE)
     run_mcp_server(app)
     await uvicorn.Server(config).serve()
 
 
+def serve(**kwargs):
+    """
+    serve with APP_MAX_WORKERS worker processes, a single process serves in this one.
+    Sending SIGHUP to the parent restarts the workers one after the other.
+    """
+    workers = _worker_count()
+    if workers == 1:
+        asyncio.run(main(**kwargs))
+        return
+
+    import uvicorn
+    if _uses_nacos():
+        # the parent builds the MCP server only to register the node to Nacos, without the pools of create_app
+        app = create_app_with_configs()
+        init_logging(app)
+        init_fast_mcp(app)
+        _register_service_in_background(app.mcp, config.TRANSPORT_TYPE)
+    uvicorn.run(
+        "app:create_worker_app",
+        factory=True,
+        host=config.APP_HOST,
+        port=config.APP_PORT,
+        workers=workers,
+        **kwargs,
+    )
+
+
 if __name__ == '__main__':
     freeze_support()
-    asyncio.run(main())
\ No newline at end of file
+    serve()
@@ -10,6 +10,8 @@ from fastapi.routing import APIRoute
 from aduib_app import AduibAIApp
 from component.cache.redis_cache import init_cache
 from component.log.app_logging import init_logging
+from component.mcp.event_store import create_event_store
+from component.mcp.session_store import create_session_store
 from configs import config
 from controllers.route import api_router
 from libs.api_key_auth import ApiKeyAuthorizationServerProvider
@@ -77,7 +79,7 @@ def init_fast_mcp(app: AduibAIApp):
     global mcp
     if not config.DISCOVERY_SERVICE_ENABLED:
         from fast_mcp import FastMCP
-        mcp = FastMCP(name=config.APP_NAME,instructions=config.APP_DESCRIPTION,version=config.APP_VERSION,auth_server_provider=ApiKeyAuthorizationServerProvider() if config.AUTH_ENABLED else None)
+        mcp = FastMCP(name=config.APP_NAME,instructions=config.APP_DESCRIPTION,version=config.APP_VERSION,auth_server_provider=ApiKeyAuthorizationServerProvider() if config.AUTH_ENABLED else None,event_store=create_event_store(config),session_store=create_session_store(config))
     else:
         if config.DISCOVERY_SERVICE_TYPE=="nacos":
             from nacos_mcp_wrapper.server.nacos_settings import NacosSettings
@@ -97,7 +99,9 @@ def init_fast_mcp(app: AduibAIApp):
                            nacos_settings=nacos_settings,
                            instructions=config.APP_DESCRIPTION,
                            version=config.APP_VERSION,
-                           auth_server_provider=ApiKeyAuthorizationServerProvider() if config.AUTH_ENABLED else None)
+                           auth_server_provider=ApiKeyAuthorizationServerProvider() if config.AUTH_ENABLED else None,
+                           event_store=create_event_store(config),
+                           session_store=create_session_store(config))
     app.mcp = mcp
     load_mcp_plugins("mcp_service")
     log.info("fast mcp initialized successfully")
@@ -114,6 +118,9 @@ def run_mcp_server(app):
 @contextlib.asynccontextmanager
 async def lifespan(app: AduibAIApp) -> AsyncIterator[None]:
     log.info("Lifespan is starting")
+    # worker processes of a multi-process node follow the tool metadata in nacos, the parent registers the node
+    if app.extensions.get("nacos_tools_sync"):
+        await app.mcp.sync_tools()
     session_manager = app.mcp.session_manager
     if session_manager:
         async with session_manager.run():
@@ -1,8 +1,11 @@
 import logging
+from datetime import timedelta
 
 import pytz
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_init
+from kombu import Queue
 import os
 import urllib.parse
 
@@ -42,24 +45,75 @@ celery_app.conf.update(
         worker_logfile=config.LOG_FILE,
     )
 
+# 按任务类型拆分队列：同步任务对时效敏感，RAG 重试可能长时间占用 worker，清理等维护任务优先级最低
+# 每个队列由独立的 worker 消费（见 deploy/docker-entrypoint.sh），慢任务不会挤占同步任务的 worker
+TASK_QUEUES = {
+    config.CELERY_SYNC_QUEUE: config.CELERY_SYNC_PRIORITY,
+    config.CELERY_RAG_RETRY_QUEUE: config.CELERY_RAG_RETRY_PRIORITY,
+    config.CELERY_MAINTENANCE_QUEUE: config.CELERY_MAINTENANCE_PRIORITY,
+}
+TASK_ROUTES = {
+    "scheduled.scheduled_tasks.blog_sync": config.CELERY_SYNC_QUEUE,
+    "scheduled.scheduled_tasks.blog_rag_retry": config.CELERY_RAG_RETRY_QUEUE,
+    "scheduled.scheduled_tasks.aduib_job_poll": config.CELERY_RAG_RETRY_QUEUE,
+    "scheduled.scheduled_tasks.clean_knowledge_documents": config.CELERY_MAINTENANCE_QUEUE,
+    "scheduled.scheduled_tasks.api_key_usage_flush": config.CELERY_MAINTENANCE_QUEUE,
+}
+
+celery_app.conf.update(
+    task_queues=[Queue(name, routing_key=name) for name in TASK_QUEUES],
+    task_default_queue=config.CELERY_SYNC_QUEUE,
+    task_routes={
+        task: {"queue": queue, "routing_key": queue, "priority": TASK_QUEUES[queue]}
+        for task, queue in TASK_ROUTES.items()
+    },
+    # Redis broker 的优先级：0 最高，9 最低
+    broker_transport_options={"priority_steps": list(range(10)), "queue_order_strategy": "priority"},
+    # 每个 worker 进程只预取一个任务，避免长任务阻塞已预取的任务
+    worker_prefetch_multiplier=1,
+)
+
 # 简单的 beat schedule：每天 01:00 执行任务
 celery_app.conf.beat_schedule = {
     "daily_blog_sync": {
         "task": "scheduled.scheduled_tasks.blog_sync",
-        "schedule": crontab(minute="*/2"),  # 每 2 分钟执行一次
+        # 按最小间隔触发，任务根据积压量决定是否执行及下次执行时间
+        "schedule": timedelta(seconds=config.BLOG_SYNC_MIN_INTERVAL),
+    },
+    "clean_knowledge_documents": {
+        "task": "scheduled.scheduled_tasks.clean_knowledge_documents",
+        # 每次只处理有限的分片并记录游标，在 maintenance 队列中持续推进
+        "schedule": crontab(minute="*/5"),
     },
-    # "clean_knowledge_documents": {
-    #     "task": "scheduled.scheduled_tasks.clean_knowledge_documents",
-    #     "schedule": crontab(minute="*/2"),
-    # },
     "blog_rag_rebuild": {
         "task": "scheduled.scheduled_tasks.blog_rag_retry",
         "schedule": crontab(minute="*/60"),  # 每 60 分钟执行一次
     },
+    "api_key_usage_flush": {
+        "task": "scheduled.scheduled_tasks.api_key_usage_flush",
+        "schedule": crontab(minute="*"),  # 每分钟将 Redis 中的用量计数写入数据库
+    },
 }
 celery_app.conf.update(
     imports=["scheduled.scheduled_tasks"]
 )
 
+# 通过 celery 信号采集任务排队等待时间、执行时间和结果（见 scheduled/task_telemetry.py）
+import scheduled.task_telemetry  # noqa: E402,F401
+
+
+@worker_init.connect
+def init_worker(sender=None, **kwargs):
+    """在 worker 中初始化应用（日志、Redis 等扩展），任务可直接使用 redis_client。"""
+    from app_factory import app_context, create_app
+    from utils.rate_limit import set_serving_processes
+
+    # Redis 不可用时，限流额度按本 worker 的并发进程数均分
+    set_serving_processes(getattr(sender, "concurrency", None) or 1)
+
+    if not app_context.get():
+        create_app()
+
+
 # 方便其他模块导入
 __all__ = ("celery_app",)
@@ -0,0 +1,130 @@
+"""
+RESP3 client side cache of ``redis_client`` with configurable size and commands, and hit / miss counters.
+
+redis-py keeps one cache per connection pool and drops entries when Redis pushes an invalidation for
+one of their keys. ``client_side_cache_stats()`` sums the counters of all caches of the process.
+"""
+import threading
+import weakref
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+from redis.cache import CacheConfig, CacheEntry, CacheEntryStatus, CacheKey, DefaultCache, EvictionPolicy
+
+# every cache created by redis-py for a connection pool of this process
+_caches: "weakref.WeakSet[StatsCache]" = weakref.WeakSet()
+_caches_lock = threading.Lock()
+
+
+@dataclass
+class ClientSideCacheStats:
+    lookups: int = 0
+    misses: int = 0
+    invalidations: int = 0
+    evictions: int = 0
+    flushes: int = 0
+    size: int = 0
+
+    @property
+    def hits(self) -> int:
+        return max(self.lookups - self.misses, 0)
+
+    @property
+    def hit_ratio(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "hits": self.hits, "hit_ratio": round(self.hit_ratio, 4)}
+
+
+class StatsCache(DefaultCache):
+    """
+    DefaultCache counting its lookups, misses, invalidations and evictions.
+
+    redis-py asks ``is_cachable`` with an empty key list once per cachable command before looking it up,
+    and stores an IN_PROGRESS placeholder on every miss, so hits are the lookups without a placeholder.
+    """
+
+    def __init__(self, cache_config):
+        super().__init__(cache_config)
+        self.stats = ClientSideCacheStats()
+        with _caches_lock:
+            _caches.add(self)
+
+    def is_cachable(self, key: CacheKey) -> bool:
+        cachable = super().is_cachable(key)
+        if cachable and not key.redis_keys:
+            self.stats.lookups += 1
+        return cachable
+
+    def set(self, entry: CacheEntry) -> bool:
+        is_new = entry.cache_key not in self.collection
+        size = self.size
+        stored = super().set(entry)
+        if stored:
+            if entry.status == CacheEntryStatus.IN_PROGRESS:
+                self.stats.misses += 1
+            if is_new and self.size <= size:
+                self.stats.evictions += 1
+        return stored
+
+    def delete_by_redis_keys(self, redis_keys: list[bytes]) -> list[bool]:
+        deleted = super().delete_by_redis_keys(redis_keys)
+        self.stats.invalidations += sum(deleted)
+        return deleted
+
+    def flush(self) -> int:
+        count = super().flush()
+        self.stats.flushes += 1
+        self.stats.invalidations += count
+        return count
+
+
+class ClientSideCacheConfig(CacheConfig):
+    """CacheConfig with a configurable list of the commands whose responses are cached"""
+
+    def __init__(
+        self,
+        max_size: int = CacheConfig.DEFAULT_MAX_SIZE,
+        cache_class: Any = StatsCache,
+        eviction_policy: EvictionPolicy = CacheConfig.DEFAULT_EVICTION_POLICY,
+        allow_list: Optional[list[str]] = None,
+    ):
+        super().__init__(max_size=max_size, cache_class=cache_class, eviction_policy=eviction_policy)
+        self._allow_list = frozenset(c.upper() for c in allow_list) if allow_list else frozenset(self.DEFAULT_ALLOW_LIST)
+
+    def is_allowed_to_cache(self, command: str) -> bool:
+        return command in self._allow_list
+
+
+def create_client_side_cache_config(config) -> ClientSideCacheConfig:
+    """build the client side cache configuration from the REDIS_CLIENT_SIDE_CACHE_* settings"""
+    try:
+        eviction_policy = EvictionPolicy[config.REDIS_CLIENT_SIDE_CACHE_EVICTION_POLICY.upper()]
+    except KeyError:
+        raise ValueError(
+            f"Unsupported client side cache eviction policy {config.REDIS_CLIENT_SIDE_CACHE_EVICTION_POLICY}, "
+            f"supported: {', '.join(p.name for p in EvictionPolicy)}"
+        )
+    commands = config.REDIS_CLIENT_SIDE_CACHE_COMMANDS
+    allow_list = [c.strip() for c in commands.split(",") if c.strip()] if commands else None
+    unknown = set(c.upper() for c in allow_list or ()) - set(CacheConfig.DEFAULT_ALLOW_LIST)
+    if unknown:
+        raise ValueError(f"Commands {', '.join(sorted(unknown))} are not read only commands that can be cached")
+    return ClientSideCacheConfig(
+        max_size=config.REDIS_CLIENT_SIDE_CACHE_MAX_SIZE,
+        eviction_policy=eviction_policy,
+        allow_list=allow_list,
+    )
+
+
+def client_side_cache_stats() -> dict[str, Any]:
+    """counters of the client side caches of this process, summed over all connection pools"""
+    total = ClientSideCacheStats()
+    with _caches_lock:
+        caches = list(_caches)
+    for cache in caches:
+        for field, value in asdict(cache.stats).items():
+            setattr(total, field, getattr(total, field) + value)
+        total.size += cache.size
+    return total.to_dict()
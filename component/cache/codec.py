@@ -0,0 +1,189 @@
+"""
+Compact codec for values stored in redis.
+
+Every encoded value starts with a 3 byte header:
+
+    version (1 byte) | serializer id (1 byte) | flags (1 byte)
+
+followed by the serialized payload, zlib compressed when it is larger than the compression threshold.
+Decoding reads the serializer from the header, so the default serializer can be changed without flushing
+redis. Values written by an unknown codec version or without a header raise ``CodecError``, callers treat
+them as cache misses.
+
+    codec = RedisCodec("json")
+    codec.set("aduib_ai:cache:post:hello", {"title": "hello"}, ex=600)
+    codec.get("aduib_ai:cache:post:hello")
+"""
+import logging
+import pickle
+import zlib
+from collections.abc import Mapping
+from typing import Any, Optional
+
+from pydantic_core import from_json, to_json
+
+from component.cache.redis_cache import redis_client
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+CODEC_VERSION = 1
+
+_FLAG_ZLIB = 0x01
+
+
+class CodecError(ValueError):
+    """raised when a value cannot be decoded by this codec"""
+
+
+class Serializer:
+    id: int
+    name: str
+
+    def dumps(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+
+class JsonSerializer(Serializer):
+    """JSON through pydantic-core, also handles pydantic models, datetimes and uuids (decoded as plain values)"""
+    id = 1
+    name = "json"
+
+    def dumps(self, value: Any) -> bytes:
+        return to_json(value)
+
+    def loads(self, data: bytes) -> Any:
+        return from_json(data)
+
+
+class PickleSerializer(Serializer):
+    """pickle, keeps the python types of the value, only for values written and read by this app"""
+    id = 2
+    name = "pickle"
+
+    def dumps(self, value: Any) -> bytes:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+class MsgpackSerializer(Serializer):
+    """msgpack, only available when the msgpack package is installed"""
+    id = 3
+    name = "msgpack"
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+_serializers: dict[int, Serializer] = {s.id: s for s in (JsonSerializer(), PickleSerializer())}
+if msgpack is not None:
+    _serializers[MsgpackSerializer.id] = MsgpackSerializer()
+_serializers_by_name: dict[str, Serializer] = {s.name: s for s in _serializers.values()}
+
+
+def get_serializer(name: str) -> Serializer:
+    serializer = _serializers_by_name.get(name)
+    if serializer is None:
+        raise ValueError(f"Unknown or unavailable serializer {name}, available: {', '.join(_serializers_by_name)}")
+    return serializer
+
+
+class RedisCodec:
+    """
+    Encodes values to compact bytes and reads / writes them through ``redis_client``.
+
+    Args:
+        serializer: Name of the serializer used for writing (json, pickle or msgpack), defaults to
+                    REDIS_CODEC_SERIALIZER.
+        compress_threshold: Payloads larger than this many bytes are zlib compressed, defaults to
+                            REDIS_CODEC_COMPRESS_THRESHOLD. 0 disables compression.
+        compress_level: zlib compression level.
+    """
+
+    def __init__(
+        self,
+        serializer: Optional[str] = None,
+        compress_threshold: Optional[int] = None,
+        compress_level: int = 6,
+    ):
+        from configs import config
+
+        self.serializer = get_serializer(serializer or config.REDIS_CODEC_SERIALIZER)
+        self.compress_threshold = (
+            compress_threshold if compress_threshold is not None else config.REDIS_CODEC_COMPRESS_THRESHOLD
+        )
+        self.compress_level = compress_level
+
+    def encode(self, value: Any) -> bytes:
+        payload = self.serializer.dumps(value)
+        flags = 0
+        if self.compress_threshold and len(payload) > self.compress_threshold:
+            compressed = zlib.compress(payload, self.compress_level)
+            # incompressible payloads (already compressed images, random tokens) are kept as they are
+            if len(compressed) < len(payload):
+                payload = compressed
+                flags |= _FLAG_ZLIB
+        return bytes((CODEC_VERSION, self.serializer.id, flags)) + payload
+
+    def decode(self, data: bytes) -> Any:
+        if len(data) < 3:
+            raise CodecError("value is too short to carry a codec header")
+        version, serializer_id, flags = data[0], data[1], data[2]
+        if version != CODEC_VERSION:
+            raise CodecError(f"unsupported codec version {version}")
+        serializer = _serializers.get(serializer_id)
+        if serializer is None:
+            raise CodecError(f"unknown or unavailable serializer id {serializer_id}")
+        payload = data[3:]
+        try:
+            if flags & _FLAG_ZLIB:
+                payload = zlib.decompress(payload)
+            return serializer.loads(payload)
+        except Exception as e:
+            raise CodecError(f"cannot decode {serializer.name} value: {e}") from e
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """read and decode a value, undecodable values are logged and returned as default"""
+        return self._decode_or_default(key, redis_client.get(key), default)
+
+    def set(self, key: str, value: Any, ex: Optional[int] = None, nx: bool = False) -> bool:
+        return bool(redis_client.set(key, self.encode(value), ex=ex, nx=nx))
+
+    def mget(self, keys: list[str], default: Any = None) -> list[Any]:
+        """read several values in one round trip, a pipeline instead of MGET so the keys may span cluster slots"""
+        if not keys:
+            return []
+        pipe = redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.get(key)
+        return [self._decode_or_default(key, raw, default) for key, raw in zip(keys, pipe.execute())]
+
+    def mset(self, mapping: Mapping[str, Any], ex: Optional[int] = None) -> None:
+        """write several values in one round trip, each with the same ttl"""
+        if not mapping:
+            return
+        pipe = redis_client.pipeline(transaction=False)
+        for key, value in mapping.items():
+            pipe.set(key, self.encode(value), ex=ex)
+        pipe.execute()
+
+    def _decode_or_default(self, key: str, raw: Optional[bytes], default: Any) -> Any:
+        if raw is None:
+            return default
+        try:
+            return self.decode(raw)
+        except CodecError as e:
+            logger.warning(f"Ignoring undecodable value of {key}: {e}")
+            return default
@@ -0,0 +1,116 @@
+"""
+Batched redis commands.
+
+    batch = RedisBatch()
+    batch.hincrby(usage_key, "request_count", 1).expire(usage_key, 86400)
+    batch.sadd(pending_key, usage_key)
+    batch.execute()  # one round trip, results in the order the commands were queued
+
+Commands are queued by calling them on the batch with the same arguments as on ``redis_client``.
+The first argument of every queued command must be its key.
+"""
+import logging
+from typing import Any, Optional
+
+from redis.crc import key_slot
+
+from component.cache.redis_cache import async_redis_client, redis_client
+
+logger = logging.getLogger(__name__)
+
+
+def _use_clusters() -> bool:
+    from configs import config
+
+    return config.REDIS_USE_CLUSTERS
+
+
+def _encode_key(key: Any) -> bytes:
+    if isinstance(key, bytes):
+        return key
+    return str(key).encode("utf-8")
+
+
+class _BaseRedisBatch:
+    def __init__(self, client, transaction: bool = False):
+        self._client = client
+        self.transaction = transaction
+        self._commands: list[tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def queue(*args, **kwargs):
+            if not args:
+                raise TypeError(f"{name} needs the key as first argument to be batched")
+            self._commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    def __len__(self) -> int:
+        return len(self._commands)
+
+    def _take_groups(self) -> tuple[list[tuple[str, tuple, dict]], list[list[int]]]:
+        """
+        take the queued commands and split them into the pipelines to send, as lists of command indexes
+
+        MULTI/EXEC on a cluster only works within one hash slot, so transactional batches are sent as one
+        transaction per slot there. Non transactional cluster pipelines are already split per node by redis-py.
+        """
+        commands, self._commands = self._commands, []
+        if not (self.transaction and _use_clusters()):
+            return commands, [list(range(len(commands)))] if commands else []
+        groups: dict[int, list[int]] = {}
+        for i, (_, args, _) in enumerate(commands):
+            groups.setdefault(key_slot(_encode_key(args[0])), []).append(i)
+        return commands, list(groups.values())
+
+
+class RedisBatch(_BaseRedisBatch):
+    """
+    Collects redis commands and sends them in one pipeline.
+
+    Args:
+        client: The client to send the commands with, defaults to ``redis_client``.
+        transaction: Wrap the commands in MULTI/EXEC. On a cluster the commands are atomic per hash slot only.
+    """
+
+    def __init__(self, client=None, transaction: bool = False):
+        super().__init__(client if client is not None else redis_client, transaction)
+
+    def execute(self, raise_on_error: bool = True) -> list[Any]:
+        """send the queued commands, return their results in queue order and clear the batch"""
+        commands, groups = self._take_groups()
+        results: list[Optional[Any]] = [None] * len(commands)
+        for indexes in groups:
+            pipe = self._client.pipeline(transaction=self.transaction)
+            for i in indexes:
+                name, args, kwargs = commands[i]
+                getattr(pipe, name)(*args, **kwargs)
+            for i, result in zip(indexes, pipe.execute(raise_on_error=raise_on_error)):
+                results[i] = result
+        return results
+
+
+class AsyncRedisBatch(_BaseRedisBatch):
+    """
+    redis.asyncio counterpart of ``RedisBatch``, sends the commands with ``async_redis_client`` by default.
+    """
+
+    def __init__(self, client=None, transaction: bool = False):
+        super().__init__(client if client is not None else async_redis_client, transaction)
+
+    async def execute(self, raise_on_error: bool = True) -> list[Any]:
+        """send the queued commands, return their results in queue order and clear the batch"""
+        commands, groups = self._take_groups()
+        results: list[Optional[Any]] = [None] * len(commands)
+        for indexes in groups:
+            pipe = self._client.pipeline(transaction=self.transaction)
+            for i in indexes:
+                name, args, kwargs = commands[i]
+                getattr(pipe, name)(*args, **kwargs)
+            for i, result in zip(indexes, await pipe.execute(raise_on_error=raise_on_error)):
+                results[i] = result
+        return results
@@ -1,16 +1,24 @@
+import asyncio
 import functools
+import inspect
 import logging
+import os
+import threading
 from collections.abc import Callable
-from typing import Any
+from typing import Any, Optional
 
 import redis
+import redis.asyncio
 from redis import RedisError
-from redis.cache import CacheConfig
+from redis.asyncio.cluster import ClusterNode as AsyncClusterNode
+from redis.asyncio.cluster import RedisCluster as AsyncRedisCluster
+from redis.asyncio.sentinel import Sentinel as AsyncSentinel
 from redis.cluster import ClusterNode, RedisCluster
 from redis.connection import Connection
 from redis.sentinel import Sentinel
 
 from aduib_app import AduibAIApp
+from component.cache.client_side_cache import create_client_side_cache_config
 
 logger = logging.getLogger(__name__)
 
@@ -32,16 +40,28 @@ class RedisClientWrapper:
 
     Methods:
         initialize(client): Initializes the Redis client if it hasn't been initialized already.
+        swap(client): Replaces the Redis client, used by the health monitor after a failover.
         __getattr__(item): Delegates attribute access to the Redis client, raising an error
                            if the client is not initialized.
     """
 
     def __init__(self):
         self._client = None
+        self._lock = threading.Lock()
 
     def initialize(self, client):
-        if self._client is None:
-            self._client = client
+        with self._lock:
+            if self._client is None:
+                self._client = client
+
+    def swap(self, client):
+        """
+        replace the Redis client and return the previous one.
+        Callers that already resolved an attribute of the previous client keep using it until they finish.
+        """
+        with self._lock:
+            old_client, self._client = self._client, client
+        return old_client
 
     def __getattr__(self, item):
         if self._client is None:
@@ -49,7 +69,62 @@ class RedisClientWrapper:
         return getattr(self._client, item)
 
 
+class AsyncRedisClientWrapper(RedisClientWrapper):
+    """
+    RedisClientWrapper for redis.asyncio clients.
+
+    The connections of a redis.asyncio client belong to the event loop that opened them, and using them from
+    another loop fails with "attached to a different loop". Besides the server loop, ``AsyncUtils.run_async``
+    threads and celery tasks run their own loops, so the wrapper keeps one client per event loop, built by
+    the factory passed to ``initialize`` on first use in that loop. Clients of closed loops are dropped.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._factory: Optional[Callable[[], Any]] = None
+        # id of the loop -> (loop, client), the loop is kept to tell whether it was closed
+        self._clients: dict[int, tuple[Optional[asyncio.AbstractEventLoop], Any]] = {}
+
+    def initialize(self, factory: Callable[[], Any]):
+        with self._lock:
+            if self._factory is None:
+                self._factory = factory
+
+    def swap(self, factory: Callable[[], Any]) -> list[tuple[Optional[asyncio.AbstractEventLoop], Any]]:
+        """
+        build the clients with a new factory from now on and return the (loop, client) pairs built before.
+        Callers that already resolved an attribute of a previous client keep using it until they finish.
+        """
+        with self._lock:
+            self._factory = factory
+            old_clients, self._clients = list(self._clients.values()), {}
+        return old_clients
+
+    def _current_client(self):
+        if self._factory is None:
+            raise RuntimeError("Redis client is not initialized. Call init_app first.")
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # outside of a coroutine, e.g. building a pipeline before running it
+            loop = None
+        key = id(loop)
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is None or entry[0] is not loop:
+                for loop_id, (client_loop, _) in list(self._clients.items()):
+                    if client_loop is not None and client_loop.is_closed():
+                        del self._clients[loop_id]
+                entry = self._clients[key] = (loop, self._factory())
+        return entry[1]
+
+    def __getattr__(self, item):
+        return getattr(self._current_client(), item)
+
+
 redis_client = RedisClientWrapper()
+# redis.asyncio counterpart of redis_client for coroutines, built from the same configuration per event loop
+async_redis_client = AsyncRedisClientWrapper()
 
 
 def init_cache(app: AduibAIApp):
@@ -57,12 +132,11 @@ def init_cache(app: AduibAIApp):
     if not config.REDIS_ENABLED:
         logger.info("Redis is not enabled, skipping initialization")
         return
-    global redis_client
-    connection_class: type[Connection] = Connection
+    global redis_client, async_redis_client, redis_health_monitor
     resp_protocol = config.REDIS_SERIALIZATION_PROTOCOL
     if config.REDIS_ENABLE_CLIENT_SIDE_CACHE:
         if resp_protocol >= 3:
-            clientside_cache_config = CacheConfig()
+            clientside_cache_config = create_client_side_cache_config(config)
         else:
             raise ValueError("Client side cache is only supported in RESP3")
     else:
@@ -76,15 +150,60 @@ def init_cache(app: AduibAIApp):
         "encoding_errors": "strict",
         "decode_responses": False,
         "protocol": resp_protocol,
+        "socket_timeout": config.REDIS_SOCKET_TIMEOUT,
+        "socket_connect_timeout": config.REDIS_SOCKET_CONNECT_TIMEOUT,
+        "health_check_interval": config.REDIS_HEALTH_CHECK_INTERVAL,
+    }
+
+    sync_params = {
+        **redis_params,
         "cache_config": clientside_cache_config,
+        **_pool_size_params(config.REDIS_MAX_CONNECTIONS),
     }
+    async_params = {**redis_params, **_pool_size_params(config.REDIS_ASYNC_MAX_CONNECTIONS)}
+    redis_client.initialize(create_redis_client(config, sync_params))
+    if clientside_cache_config is not None:
+        logger.info("redis.asyncio has no client side cache, async_redis_client reads always go to Redis")
+    async_redis_client.initialize(lambda: create_redis_client(config, async_params, use_async=True))
+
+    if config.REDIS_HEALTH_MONITOR_ENABLED:
+        if redis_health_monitor is not None:
+            redis_health_monitor.stop()
+        redis_health_monitor = RedisHealthMonitor(
+            client_factory=lambda: create_redis_client(config, sync_params),
+            async_client_factory=lambda: create_redis_client(config, async_params, use_async=True),
+            interval=config.REDIS_HEALTH_MONITOR_INTERVAL,
+            failure_threshold=config.REDIS_HEALTH_MONITOR_FAILURE_THRESHOLD,
+            close_delay=config.REDIS_HEALTH_MONITOR_CLOSE_DELAY,
+        )
+        redis_health_monitor.start()
+
+    app.extensions["cache"] = redis_client
+    app.extensions["async_cache"] = async_redis_client
+    logger.info("Redis initialized successfully")
+
 
+def _pool_size_params(max_connections: Optional[int]) -> dict[str, Any]:
+    # leave the redis-py default (unbounded) when no size is configured
+    return {"max_connections": max_connections} if max_connections else {}
+
+
+def create_redis_client(config, redis_params: dict[str, Any], use_async: bool = False):
+    """
+    create a standalone, Sentinel or Cluster client for the configured topology.
+
+    Args:
+        config: The app config holding the REDIS_* settings.
+        redis_params: Connection parameters shared by all topologies.
+        use_async: Build a redis.asyncio client instead of a synchronous one.
+    """
     if config.REDIS_USE_SENTINEL:
         assert config.REDIS_SENTINELS is not None, "REDIS_SENTINELS must be set when REDIS_USE_SENTINEL is True"
         sentinel_hosts = [
             (node.split(":")[0], int(node.split(":")[1])) for node in config.REDIS_SENTINELS.split(",")
         ]
-        sentinel = Sentinel(
+        sentinel_class = AsyncSentinel if use_async else Sentinel
+        sentinel = sentinel_class(
             sentinel_hosts,
             sentinel_kwargs={
                 "socket_timeout": config.REDIS_SENTINEL_SOCKET_TIMEOUT,
@@ -92,56 +211,208 @@ def init_cache(app: AduibAIApp):
                 "password": config.REDIS_SENTINEL_PASSWORD,
             },
         )
-        master = sentinel.master_for(config.REDIS_SENTINEL_SERVICE_NAME, **redis_params)
-        redis_client.initialize(master)
+        return sentinel.master_for(config.REDIS_SENTINEL_SERVICE_NAME, **redis_params)
     elif config.REDIS_USE_CLUSTERS:
         assert config.REDIS_CLUSTERS is not None, "REDIS_CLUSTERS must be set when REDIS_USE_CLUSTERS is True"
+        node_class, cluster_class = (AsyncClusterNode, AsyncRedisCluster) if use_async else (ClusterNode, RedisCluster)
         nodes = [
-            ClusterNode(host=node.split(":")[0], port=int(node.split(":")[1]))
+            node_class(host=node.split(":")[0], port=int(node.split(":")[1]))
             for node in config.REDIS_CLUSTERS.split(",")
         ]
-        redis_client.initialize(
-            RedisCluster(
-                startup_nodes=nodes,
-                password=config.REDIS_CLUSTERS_PASSWORD,
-                protocol=resp_protocol,
-                cache_config=clientside_cache_config,
-            )
+        cluster_params = {
+            k: v for k, v in redis_params.items() if k not in ("username", "password", "db")
+        }
+        return cluster_class(
+            startup_nodes=nodes,
+            password=config.REDIS_CLUSTERS_PASSWORD,
+            **cluster_params,
         )
     else:
-        redis_params.update(
-            {
-                "host": config.REDIS_HOST,
-                "port": config.REDIS_PORT,
-                "connection_class": connection_class,
-                "protocol": resp_protocol,
-                "cache_config": clientside_cache_config,
-            }
+        if use_async:
+            pool = redis.asyncio.ConnectionPool(host=config.REDIS_HOST, port=config.REDIS_PORT, **redis_params)
+            return redis.asyncio.Redis(connection_pool=pool)
+        pool = redis.ConnectionPool(
+            host=config.REDIS_HOST,
+            port=config.REDIS_PORT,
+            connection_class=Connection,
+            **redis_params,
         )
-        pool = redis.ConnectionPool(**redis_params)
-        redis_client.initialize(redis.Redis(connection_pool=pool))
+        return redis.Redis(connection_pool=pool)
 
-    app.extensions["cache"] = redis_client
-    logger.info("Redis initialized successfully")
 
+class RedisHealthMonitor:
+    """
+    Background thread that swaps ``redis_client`` and ``async_redis_client`` for freshly built clients when
+
+    - Sentinel reports a different master than on the previous check, or
+    - ``failure_threshold`` consecutive PINGs failed.
+
+    The previous clients are closed ``close_delay`` seconds after the swap, so calls that already hold one
+    of their connections can finish. Async clients are closed on the event loops that opened their connections.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any],
+        async_client_factory: Optional[Callable[[], Any]] = None,
+        interval: float = 5.0,
+        failure_threshold: int = 3,
+        close_delay: float = 30.0,
+    ):
+        self.client_factory = client_factory
+        self.async_client_factory = async_client_factory
+        self.interval = interval
+        self.failure_threshold = failure_threshold
+        self.close_delay = close_delay
+        self.swaps = 0
+        self._failures = 0
+        self._master: Optional[tuple[str, int]] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="redis-health-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.warning(f"Redis health check failed: {e}", exc_info=True)
+
+    def check(self):
+        """run one health check, swapping the clients if the master changed or redis stays unreachable"""
+        reason = None
+        master = self._discover_master()
+        if master is not None:
+            if self._master is not None and master != self._master:
+                reason = f"sentinel master changed from {self._master} to {master}"
+            self._master = master
+        if reason is None:
+            try:
+                redis_client.ping()
+                self._failures = 0
+            except RedisError as e:
+                self._failures += 1
+                if self._failures >= self.failure_threshold:
+                    reason = f"{self._failures} consecutive ping failures ({e})"
+        if reason is not None:
+            self.swap_clients(reason)
+
+    def _discover_master(self) -> Optional[tuple[str, int]]:
+        pool = getattr(redis_client, "connection_pool", None)
+        sentinel_manager = getattr(pool, "sentinel_manager", None)
+        if sentinel_manager is None:
+            return None
+        try:
+            return sentinel_manager.discover_master(pool.service_name)
+        except RedisError as e:
+            logger.warning(f"Unable to discover the redis master from sentinel: {e}")
+            return None
+
+    def swap_clients(self, reason: str):
+        logger.warning(f"Rebuilding redis clients: {reason}")
+        try:
+            client = self.client_factory()
+        except Exception as e:
+            logger.error(f"Unable to rebuild redis clients: {e}")
+            return
+        old_client = redis_client.swap(client)
+        old_async_clients = []
+        if self.async_client_factory is not None:
+            # the async clients are rebuilt per event loop on their next use
+            old_async_clients = async_redis_client.swap(self.async_client_factory)
+        self._failures = 0
+        self.swaps += 1
+        if old_client is not None or old_async_clients:
+            timer = threading.Timer(self.close_delay, _close_replaced_clients, args=(old_client, old_async_clients))
+            timer.daemon = True
+            timer.start()
 
 
-def redis_fallback(default_return: Any = None):
+def _close_replaced_clients(client, async_clients: list[tuple[Optional[asyncio.AbstractEventLoop], Any]]):
+    if client is not None:
+        _close_quietly(client)
+    for loop, async_client in async_clients:
+        # a client built outside of a coroutine has no loop to close it on, it is left to the garbage collector
+        if loop is None or loop.is_closed():
+            continue
+        try:
+            asyncio.run_coroutine_threadsafe(_aclose_quietly(async_client), loop)
+        except RuntimeError:
+            # the loop was closed in the meantime, together with the connections of the client
+            pass
+
+
+def _close_quietly(client):
+    try:
+        client.close()
+    except Exception as e:
+        logger.debug(f"Error closing replaced redis client: {e}")
+
+
+async def _aclose_quietly(client):
+    try:
+        await client.aclose()
+    except Exception as e:
+        logger.debug(f"Error closing replaced async redis client: {e}")
+
+
+redis_health_monitor: Optional[RedisHealthMonitor] = None
+
+
+def _restart_health_monitor_after_fork():
+    # threads do not survive fork, prefork workers (celery, multi-process uvicorn) need their own monitor
+    if redis_health_monitor is not None:
+        redis_health_monitor.start()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_health_monitor_after_fork)
+
+
+def redis_fallback(default_return: Any = None, fallback: Callable | None = None):
     """
     decorator to handle Redis operation exceptions and return a default value when Redis is unavailable.
+    Both plain functions and coroutine functions can be decorated.
 
     Args:
         default_return: The value to return when a Redis operation fails. Defaults to None.
+        fallback: Optional callable invoked with the arguments of the failed call, its result is returned
+                  instead of default_return. It may return an awaitable when decorating a coroutine function.
     """
 
     def decorator(func: Callable):
+        def on_error(e: RedisError, args, kwargs):
+            logger.warning("Redis operation failed in %s: %s", func.__name__, str(e), exc_info=True)
+            if fallback is not None:
+                return fallback(*args, **kwargs)
+            return default_return
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                try:
+                    return await func(*args, **kwargs)
+                except RedisError as e:
+                    result = on_error(e, args, kwargs)
+                    return await result if inspect.isawaitable(result) else result
+
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             try:
                 return func(*args, **kwargs)
             except RedisError as e:
-                logger.warning("Redis operation failed in %s: %s", func.__name__, str(e), exc_info=True)
-                return default_return
+                return on_error(e, args, kwargs)
 
         return wrapper
 
@@ -0,0 +1,284 @@
+"""
+Two-tier cache decorator: an in-process LRU in front of redis.
+
+    @cached(ttl=600, soft_ttl=60)
+    def get_post(name: str) -> dict: ...
+
+    get_post("hello")             # local LRU -> redis -> get_post
+    get_post.invalidate("hello")  # drop the entry from both tiers
+    get_post.cache_stats          # hit / miss counters
+
+cache_stats() returns the counters of all cached functions of the process, served by GET /metrics.
+"""
+import functools
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
+from typing import Any, Optional, Union
+
+from component.cache.codec import CodecError, RedisCodec
+from component.cache.redis_cache import redis_client, redis_fallback
+from utils.async_utils import async_thread_pool
+
+logger = logging.getLogger(__name__)
+
+_CACHE_KEY = "aduib_ai:cache:{}:{}"
+_REFRESH_LOCK_KEY = "aduib_ai:cache:{}:{}:refresh"
+
+_MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    local_hits: int = 0
+    redis_hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    loads: int = 0
+    load_errors: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        hits = self.local_hits + self.redis_hits
+        total = hits + self.misses
+        return hits / total if total else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "hit_ratio": round(self.hit_ratio, 4)}
+
+
+@dataclass
+class _CacheEntry:
+    value: Any
+    soft_expire_at: float
+    expire_at: float
+
+
+class LocalLRUCache:
+    """Thread safe in-process LRU with per entry expiry."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[_CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expire_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: _CacheEntry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SingleFlight:
+    """Collapses concurrent calls for the same key into one call, the other callers wait for its result."""
+
+    def __init__(self):
+        self._calls: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def in_flight(self, key: str) -> bool:
+        with self._lock:
+            return key in self._calls
+
+
+# name -> stats of every cached function, for metrics export
+_cache_stats: dict[str, CacheStats] = {}
+
+
+def cache_stats() -> dict[str, dict[str, Any]]:
+    """hit / miss counters of all cached functions"""
+    return {name: stats.to_dict() for name, stats in _cache_stats.items()}
+
+
+def _default_key(*args, **kwargs) -> str:
+    return hashlib.sha1(repr((args, sorted(kwargs.items()))).encode("utf-8")).hexdigest()
+
+
+@redis_fallback()
+def _redis_get(key: str) -> Optional[bytes]:
+    return redis_client.get(key)
+
+
+@redis_fallback()
+def _redis_set(key: str, value: bytes, ttl: int):
+    redis_client.set(key, value, ex=ttl)
+
+
+@redis_fallback()
+def _redis_delete(key: str):
+    redis_client.delete(key)
+
+
+@redis_fallback(default_return=True)
+def _acquire_refresh_lock(key: str, ttl: int) -> bool:
+    return bool(redis_client.set(key, b"1", nx=True, ex=ttl))
+
+
+def cached(
+    ttl: Union[int, Callable[[Any], int]] = 300,
+    soft_ttl: Optional[int] = None,
+    local_ttl: Optional[int] = 30,
+    local_maxsize: int = 1024,
+    name: Optional[str] = None,
+    key_func: Optional[Callable[..., str]] = None,
+    serializer: Optional[str] = None,
+):
+    """
+    cache the results of a function in a local LRU and in redis.
+
+    Args:
+        ttl: Seconds an entry lives in redis, or a callable computing it from the result (per key ttl).
+        soft_ttl: Seconds after which an entry is stale. Stale entries are still returned while one caller
+                  reloads them in the background (stale-while-revalidate). None disables it.
+        local_ttl: Seconds an entry lives in the local LRU, bounds how long other processes may serve a value
+                   invalidated elsewhere. None or 0 disables the local tier.
+        local_maxsize: Maximum entries of the local LRU.
+        name: Namespace of the redis keys, defaults to the module and qualified name of the function.
+        key_func: Builds the cache key from the call arguments, defaults to a hash of their repr.
+        serializer: Codec serializer of the redis tier, defaults to REDIS_CODEC_SERIALIZER. Pass "pickle"
+                    explicitly for results json can not represent, pickled entries are only as trusted as redis.
+
+    Concurrent misses of one key in a process are collapsed into one call of the function (single flight).
+    Redis errors are logged and treated as misses, the function result is still returned.
+    """
+
+    def decorator(func: Callable):
+        cache_name = name or f"{func.__module__}.{func.__qualname__}"
+        make_key = key_func or _default_key
+        local_cache = LocalLRUCache(local_maxsize) if local_ttl else None
+        single_flight = SingleFlight()
+        stats = _cache_stats.setdefault(cache_name, CacheStats())
+        codec = RedisCodec(serializer)
+
+        def load(key: str, args, kwargs) -> Any:
+            try:
+                value = func(*args, **kwargs)
+            except Exception:
+                stats.load_errors += 1
+                raise
+            stats.loads += 1
+            entry_ttl = ttl(value) if callable(ttl) else ttl
+            now = time.time()
+            expire_at = now + entry_ttl
+            soft_expire_at = now + min(soft_ttl, entry_ttl) if soft_ttl else expire_at
+            try:
+                raw = codec.encode((value, soft_expire_at, expire_at))
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Not caching a result of {cache_name} in redis, it can not be encoded: {e}")
+            else:
+                _redis_set(_CACHE_KEY.format(cache_name, key), raw, entry_ttl)
+            if local_cache is not None:
+                local_cache.set(key, _CacheEntry(value, soft_expire_at, now + min(local_ttl, entry_ttl)))
+            return value
+
+        def refresh(key: str, args, kwargs):
+            if single_flight.in_flight(key):
+                return
+            # one refresh per key across all processes, the others keep serving the stale value
+            if not _acquire_refresh_lock(_REFRESH_LOCK_KEY.format(cache_name, key), max(soft_ttl or 1, 1)):
+                return
+
+            def run():
+                try:
+                    single_flight.do(key, lambda: load(key, args, kwargs))
+                except Exception as e:
+                    logger.warning(f"Background refresh of {cache_name} failed: {e}")
+
+            async_thread_pool.submit(run)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_key(*args, **kwargs)
+            now = time.time()
+
+            if local_cache is not None:
+                entry = local_cache.get(key)
+                if entry is not None:
+                    stats.local_hits += 1
+                    if entry.soft_expire_at <= now:
+                        stats.stale_hits += 1
+                        refresh(key, args, kwargs)
+                    return entry.value
+
+            raw = _redis_get(_CACHE_KEY.format(cache_name, key))
+            value = _MISSING
+            if raw is not None:
+                try:
+                    value, soft_expire_at, expire_at = codec.decode(raw)
+                except (CodecError, TypeError, ValueError) as e:
+                    logger.warning(f"Dropping undecodable cache entry of {cache_name}: {e}")
+            if value is not _MISSING:
+                stats.redis_hits += 1
+                if local_cache is not None:
+                    # the local copy must not outlive the redis entry it was read from
+                    local_cache.set(key, _CacheEntry(value, soft_expire_at, min(now + local_ttl, expire_at)))
+                if soft_expire_at <= now:
+                    stats.stale_hits += 1
+                    refresh(key, args, kwargs)
+                return value
+
+            stats.misses += 1
+            return single_flight.do(key, lambda: load(key, args, kwargs))
+
+        def invalidate(*args, **kwargs):
+            """drop the entry of these arguments from both tiers"""
+            key = make_key(*args, **kwargs)
+            if local_cache is not None:
+                local_cache.delete(key)
+            _redis_delete(_CACHE_KEY.format(cache_name, key))
+
+        def cache_clear():
+            """drop all entries of the local tier of this process"""
+            if local_cache is not None:
+                local_cache.clear()
+
+        wrapper.invalidate = invalidate
+        wrapper.cache_clear = cache_clear
+        wrapper.cache_stats = stats
+        return wrapper
+
+    return decorator
@@ -1,5 +1,6 @@
 import logging
-from typing import Optional
+import os
+from typing import Any, Dict, Optional
 
 from component.halo.base import BaseHTTPClient
 from configs import config
@@ -39,6 +40,42 @@ class AduibAIClient(BaseHTTPClient):
         if not self._authenticated:
             self.authenticate()
 
+    def submit_job(
+        self,
+        path: str,
+        json: Optional[Dict[str, Any]] = None,
+        callback_url: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        以异步任务方式提交请求，服务端立即返回任务 ID 而不是等待任务完成。
+
+        参数:
+            path: 请求路径
+            json: 请求体
+            callback_url: 任务状态变化时服务端回调的地址
+
+        返回:
+            响应 JSON，包含 job_id；服务端不支持异步任务时为同步执行的结果
+        """
+        self.ensure_authenticated()
+        payload = {**(json or {}), "async": True}
+        if callback_url:
+            payload["callback_url"] = callback_url
+        return self.post(path, json=payload)
+
+    def get_job(self, job_id: str) -> Dict[str, Any]:
+        """
+        查询异步任务的状态与进度。
+
+        参数:
+            job_id: 任务 ID
+
+        返回:
+            任务状态，包含 status 与 progress
+        """
+        self.ensure_authenticated()
+        return self.get(f"/v1/jobs/{job_id}")
+
 
 # Global aduib_ai client instance
 aduib_ai_client: Optional[AduibAIClient] = None
@@ -56,3 +93,13 @@ def get_aduib_ai_client() -> AduibAIClient:
         aduib_ai_client.authenticate()
         logger.info("aduib_ai 客户端已初始化")
     return aduib_ai_client
+
+
+def _reset_client_after_fork():
+    # fork 出的子进程不能复用父进程的 HTTP 连接，丢弃后在子进程中按需重新创建
+    global aduib_ai_client
+    aduib_ai_client = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_client_after_fork)
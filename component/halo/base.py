@@ -7,6 +7,14 @@ import httpx
 logger = logging.getLogger(__name__)
 
 
+class ResourceNotFoundError(RuntimeError):
+    """请求的资源不存在（404）"""
+
+
+class MethodNotAllowedError(RuntimeError):
+    """服务端不支持该请求方法（405），例如旧版本服务端没有该接口"""
+
+
 class BaseHTTPClient:
     """通用功能的基础 HTTP 客户端"""
 
@@ -102,6 +110,7 @@ class BaseHTTPClient:
         异常:
             AuthenticationError：认证失败
             ResourceNotFoundError：资源未找到
+            MethodNotAllowedError：请求方法不被允许
             NetworkError：网络/HTTP 错误
         """
         if not self._client:
@@ -142,7 +151,11 @@ class BaseHTTPClient:
 
                 if response.status_code == 404:
                     logger.error(f"资源未找到（404）：{url}")
-                    raise RuntimeError(f"资源未找到：{url}")
+                    raise ResourceNotFoundError(f"资源未找到：{url}")
+
+                if response.status_code == 405:
+                    logger.error(f"请求方法不被允许（405）：{method} {url}")
+                    raise MethodNotAllowedError(f"请求方法不被允许：{method} {url}")
 
                 if response.status_code >= 500:
                     error_detail = response.text
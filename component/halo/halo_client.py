@@ -1,9 +1,10 @@
 """Halo API 客户端"""
+import os
 from typing import Optional
 
 from loguru import logger
 
-from component.halo.base import BaseHTTPClient
+from component.halo.base import BaseHTTPClient, ResourceNotFoundError
 from configs import config
 
 
@@ -39,6 +40,30 @@ class HaloClient(BaseHTTPClient):
         if not self._authenticated:
             self.authenticate()
 
+    def get_post(self, name: str) -> Optional[dict]:
+        """
+        按名称获取文章。
+
+        参数:
+            name: 文章名称（metadata.name）
+
+        返回:
+            文章对象，不存在时返回 None
+        """
+        self.ensure_authenticated()
+        try:
+            return self.get(f"/apis/content.halo.run/v1alpha1/posts/{name}")
+        except ResourceNotFoundError:
+            return None
+
+    def publish_post(self, name: str) -> None:
+        """发布文章。"""
+        self.ensure_authenticated()
+        self.put(
+            f"/apis/api.console.halo.run/v1alpha1/posts/{name}/publish",
+            params={"async": "true"},
+        )
+
 
 # Global Halo client instance
 halo_client: Optional[HaloClient] = None
@@ -55,3 +80,13 @@ def get_halo_client() -> HaloClient:
         halo_client.authenticate()
         logger.info("Halo 客户端已初始化")
     return halo_client
+
+
+def _reset_client_after_fork():
+    # fork 出的子进程不能复用父进程的 HTTP 连接，丢弃后在子进程中按需重新创建
+    global halo_client
+    halo_client = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_client_after_fork)
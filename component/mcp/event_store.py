@@ -0,0 +1,106 @@
+"""
+Redis Streams backed ``EventStore`` so streamable-http clients can resume a dropped SSE stream.
+
+Every MCP stream of a session is one redis stream:
+
+    aduib_ai:mcp:events:<session id>:<stream id>
+
+trimmed to about ``max_len`` entries and expiring ``ttl`` seconds after its last event. Event ids sent to
+the clients are ``<stream id>:<redis entry id>``, a client resuming with ``Last-Event-ID`` gets the events
+after that entry replayed from redis, on whichever node it reconnects to.
+
+The transports of a session manager share one store, but the stream ids they use (request ids) are only
+unique within a session, so each transport gets its own view from ``for_session``.
+"""
+import logging
+from typing import Any, Optional
+
+from mcp.server.streamable_http import EventCallback, EventId, EventMessage, EventStore, StreamId
+from mcp.types import JSONRPCMessage
+
+from component.cache.redis_cache import async_redis_client
+
+logger = logging.getLogger(__name__)
+
+_EVENTS_KEY = "aduib_ai:mcp:events:{}"
+
+# entries read per XRANGE call while replaying
+_REPLAY_BATCH_SIZE = 100
+
+
+class RedisEventStore(EventStore):
+    """
+    Stores the events of streamable-http sessions in redis streams.
+
+    Args:
+        client: The redis.asyncio client to use, defaults to ``async_redis_client``.
+        max_len: Approximate number of events kept per stream, older events can no longer be replayed.
+        ttl: Seconds a stream is kept after its last event.
+        session_id: The session whose streams this store reads and writes, see ``for_session``.
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        max_len: int = 1000,
+        ttl: int = 3600,
+        session_id: Optional[str] = None,
+    ):
+        self._client = client if client is not None else async_redis_client
+        self.max_len = max_len
+        self.ttl = ttl
+        self.session_id = session_id
+
+    def for_session(self, session_id: str) -> "RedisEventStore":
+        """a store with the same settings limited to the streams of one session"""
+        return RedisEventStore(self._client, self.max_len, self.ttl, session_id)
+
+    def _stream_key(self, stream_id: StreamId) -> str:
+        if self.session_id is None:
+            return _EVENTS_KEY.format(stream_id)
+        return _EVENTS_KEY.format(f"{self.session_id}:{stream_id}")
+
+    async def store_event(self, stream_id: StreamId, message: JSONRPCMessage) -> EventId:
+        key = self._stream_key(stream_id)
+        data = message.model_dump_json(by_alias=True, exclude_none=True)
+        pipe = self._client.pipeline(transaction=False)
+        pipe.xadd(key, {"message": data}, maxlen=self.max_len, approximate=True)
+        pipe.expire(key, self.ttl)
+        entry_id, _ = await pipe.execute()
+        return f"{stream_id}:{_decode(entry_id)}"
+
+    async def replay_events_after(self, last_event_id: EventId, send_callback: EventCallback) -> StreamId | None:
+        # redis entry ids never contain ":", stream ids may
+        stream_id, _, entry_id = last_event_id.rpartition(":")
+        if not stream_id or not entry_id:
+            logger.warning(f"Ignoring malformed event id {last_event_id}")
+            return None
+        key = self._stream_key(stream_id)
+        if not await self._client.exists(key):
+            logger.warning(f"Event stream of {last_event_id} expired or never existed, nothing to replay")
+            return None
+
+        start = f"({entry_id}"
+        while True:
+            entries = await self._client.xrange(key, min=start, max="+", count=_REPLAY_BATCH_SIZE)
+            for raw_id, fields in entries:
+                next_id = _decode(raw_id)
+                message = JSONRPCMessage.model_validate_json(fields[b"message"])
+                await send_callback(EventMessage(message, f"{stream_id}:{next_id}"))
+                start = f"({next_id}"
+            if len(entries) < _REPLAY_BATCH_SIZE:
+                return stream_id
+
+
+def _decode(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def create_event_store(config) -> Optional[RedisEventStore]:
+    """the event store configured by the MCP_EVENT_STORE_* settings, None when resumability is disabled"""
+    if not config.MCP_EVENT_STORE_ENABLED:
+        return None
+    if not config.REDIS_ENABLED:
+        logger.warning("MCP_EVENT_STORE_ENABLED needs redis, streamable-http sessions will not be resumable")
+        return None
+    return RedisEventStore(max_len=config.MCP_EVENT_STORE_MAX_LEN, ttl=config.MCP_EVENT_STORE_TTL)
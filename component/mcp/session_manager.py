@@ -0,0 +1,189 @@
+"""
+StreamableHTTPSessionManager giving every session its own view of the event store.
+
+mcp shares one event store between all transports, which key the streams by request id. Request ids
+repeat across sessions, so a resuming client could be replayed the events of another session. This
+manager hands each new transport ``event_store.for_session(session_id)`` when the store supports it.
+
+In stateless mode with a session store the manager also keeps session ids valid across app instances:
+``initialize`` creates the session in the store, later requests of the session are served by a fresh
+transport on whichever instance receives them and DELETE removes it, so no sticky sessions are needed.
+"""
+import json
+import logging
+from typing import TYPE_CHECKING, Any, Optional
+from http import HTTPStatus
+from uuid import uuid4
+
+import anyio
+from anyio.abc import TaskStatus
+from mcp.server.streamable_http import MCP_SESSION_ID_HEADER, EventStore, StreamableHTTPServerTransport
+from mcp.server.lowlevel.server import Server as MCPServer
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Message, Receive, Scope, Send
+
+if TYPE_CHECKING:
+    from component.mcp.session_store import RedisSessionStore
+
+logger = logging.getLogger(__name__)
+
+
+class SessionScopedSessionManager(StreamableHTTPSessionManager):
+    """
+    Args:
+        session_store: Shared session metadata used in stateless mode, without it stateless requests are
+                       served without session ids like in mcp.
+    """
+
+    def __init__(
+        self,
+        app: MCPServer[Any, Any],
+        event_store: EventStore | None = None,
+        json_response: bool = False,
+        stateless: bool = False,
+        session_store: Optional["RedisSessionStore"] = None,
+    ):
+        super().__init__(app, event_store=event_store, json_response=json_response, stateless=stateless)
+        self.session_store = session_store
+
+    def session_event_store(self, session_id: str) -> EventStore | None:
+        if self.event_store is None:
+            return None
+        for_session = getattr(self.event_store, "for_session", None)
+        return for_session(session_id) if for_session is not None else self.event_store
+
+    async def _handle_stateful_request(self, scope: Scope, receive: Receive, send: Send) -> None:
+        request = Request(scope, receive)
+        request_mcp_session_id = request.headers.get(MCP_SESSION_ID_HEADER)
+
+        if request_mcp_session_id is not None and request_mcp_session_id in self._server_instances:
+            transport = self._server_instances[request_mcp_session_id]
+            logger.debug("Session already exists, handling request directly")
+            await transport.handle_request(scope, receive, send)
+            return
+
+        if request_mcp_session_id is None:
+            logger.debug("Creating new transport")
+            async with self._session_creation_lock:
+                new_session_id = uuid4().hex
+                http_transport = StreamableHTTPServerTransport(
+                    mcp_session_id=new_session_id,
+                    is_json_response_enabled=self.json_response,
+                    event_store=self.session_event_store(new_session_id),
+                )
+                self._server_instances[new_session_id] = http_transport
+                logger.info(f"Created new transport with session ID: {new_session_id}")
+
+                async def run_server(*, task_status: TaskStatus[None] = anyio.TASK_STATUS_IGNORED) -> None:
+                    async with http_transport.connect() as streams:
+                        read_stream, write_stream = streams
+                        task_status.started()
+                        await self.app.run(
+                            read_stream,
+                            write_stream,
+                            self.app.create_initialization_options(),
+                            stateless=False,
+                        )
+
+                assert self._task_group is not None
+                await self._task_group.start(run_server)
+
+                await http_transport.handle_request(scope, receive, send)
+        else:
+            response = Response(
+                "Bad Request: No valid session ID provided",
+                status_code=HTTPStatus.BAD_REQUEST,
+            )
+            await response(scope, receive, send)
+
+    async def _handle_stateless_request(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.session_store is None:
+            await super()._handle_stateless_request(scope, receive, send)
+            return
+
+        request = Request(scope, receive)
+        session_id = request.headers.get(MCP_SESSION_ID_HEADER)
+        if session_id is None:
+            body = await request.body() if request.method == "POST" else b""
+            receive = _replay_body(body, receive)
+            params = _initialize_params(body)
+            if params is None:
+                # requests outside of a session are served like in plain stateless mode
+                await super()._handle_stateless_request(scope, receive, send)
+                return
+            session_id = uuid4().hex
+            # created before answering, the next request of the client may reach another instance
+            await self.session_store.create(
+                session_id,
+                protocol_version=params.get("protocolVersion"),
+                client_info=params.get("clientInfo"),
+            )
+            logger.info(f"Created stateless session {session_id}")
+        elif request.method == "DELETE":
+            deleted = await self.session_store.delete(session_id)
+            response = Response(status_code=HTTPStatus.OK if deleted else HTTPStatus.NOT_FOUND)
+            await response(scope, receive, send)
+            return
+        elif not await self.session_store.touch(session_id):
+            response = Response(
+                "Not Found: Session has been terminated or has expired",
+                status_code=HTTPStatus.NOT_FOUND,
+            )
+            await response(scope, receive, send)
+            return
+
+        http_transport = StreamableHTTPServerTransport(
+            mcp_session_id=session_id,
+            is_json_response_enabled=self.json_response,
+            event_store=self.session_event_store(session_id),
+        )
+
+        # the transport only serves this request, the server task is cancelled once it is answered
+        server_scope = anyio.CancelScope()
+
+        async def run_stateless_server(*, task_status: TaskStatus[None] = anyio.TASK_STATUS_IGNORED) -> None:
+            with server_scope:
+                async with http_transport.connect() as streams:
+                    read_stream, write_stream = streams
+                    task_status.started()
+                    await self.app.run(
+                        read_stream,
+                        write_stream,
+                        self.app.create_initialization_options(),
+                        stateless=True,
+                    )
+
+        assert self._task_group is not None
+        await self._task_group.start(run_stateless_server)
+        try:
+            await http_transport.handle_request(scope, receive, send)
+        finally:
+            server_scope.cancel()
+
+
+def _initialize_params(body: bytes) -> Optional[dict[str, Any]]:
+    """params of an initialize request, None for any other body"""
+    try:
+        message = json.loads(body)
+    except ValueError:
+        return None
+    if not isinstance(message, dict) or message.get("method") != "initialize":
+        return None
+    params = message.get("params")
+    return params if isinstance(params, dict) else {}
+
+
+def _replay_body(body: bytes, receive: Receive) -> Receive:
+    """a receive callable returning the already read body again, then the messages left in receive"""
+    replayed = False
+
+    async def replay() -> Message:
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay
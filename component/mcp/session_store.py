@@ -0,0 +1,83 @@
+"""
+Redis shared metadata of streamable-http sessions, for running several stateless app instances.
+
+In stateless mode every request is served by a fresh transport, so any instance behind the load balancer
+can answer it. The only state left is whether a session id is valid, it lives in redis:
+
+    aduib_ai:mcp:session:<session id>  ->  hash of created_at, protocol_version and client_info
+
+The entry is created when a node answers ``initialize``, its ttl is refreshed on every request and removed by a
+DELETE of the session or after ``ttl`` seconds without requests.
+"""
+import json
+import logging
+import time
+from typing import Any, Optional
+
+from component.cache.redis_cache import async_redis_client, redis_fallback
+
+logger = logging.getLogger(__name__)
+
+_SESSION_KEY = "aduib_ai:mcp:session:{}"
+
+
+class RedisSessionStore:
+    """
+    Args:
+        client: The redis.asyncio client to use, defaults to ``async_redis_client``.
+        ttl: Seconds a session is kept after its last request.
+    """
+
+    def __init__(self, client: Any = None, ttl: int = 3600):
+        self._client = client if client is not None else async_redis_client
+        self.ttl = ttl
+
+    @redis_fallback()
+    async def create(
+        self,
+        session_id: str,
+        protocol_version: Optional[str] = None,
+        client_info: Optional[dict[str, Any]] = None,
+    ) -> None:
+        key = _SESSION_KEY.format(session_id)
+        mapping = {"created_at": int(time.time())}
+        if protocol_version:
+            mapping["protocol_version"] = protocol_version
+        if client_info:
+            mapping["client_info"] = json.dumps(client_info)
+        pipe = self._client.pipeline(transaction=True)
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, self.ttl)
+        await pipe.execute()
+
+    @redis_fallback(default_return=True)
+    async def touch(self, session_id: str) -> bool:
+        """
+        refresh the session and return whether it exists.
+        Sessions are taken as valid while redis is unreachable, requests do not need anything else from it.
+        """
+        return bool(await self._client.expire(_SESSION_KEY.format(session_id), self.ttl))
+
+    @redis_fallback()
+    async def get(self, session_id: str) -> Optional[dict[str, Any]]:
+        data = await self._client.hgetall(_SESSION_KEY.format(session_id))
+        if not data:
+            return None
+        session = {k.decode("utf-8"): v.decode("utf-8") for k, v in data.items()}
+        if "client_info" in session:
+            session["client_info"] = json.loads(session["client_info"])
+        return session
+
+    @redis_fallback(default_return=False)
+    async def delete(self, session_id: str) -> bool:
+        return bool(await self._client.delete(_SESSION_KEY.format(session_id)))
+
+
+def create_session_store(config) -> Optional[RedisSessionStore]:
+    """the session store of stateless mode (MCP_STATELESS_HTTP), None when sessions are not shared"""
+    if not config.MCP_STATELESS_HTTP:
+        return None
+    if not config.REDIS_ENABLED:
+        logger.warning("MCP_STATELESS_HTTP without redis, requests are served without session ids")
+        return None
+    return RedisSessionStore(ttl=config.MCP_SESSION_TTL)
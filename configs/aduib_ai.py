@@ -6,4 +6,23 @@ class AduibAiConfig(BaseSettings):
 
     ADUIB_SERVICE_URL: str = Field(default="https://aduib.ai",description="Aduib service url")
     ADUIB_SERVICE_TOKEN: str = Field(default="",description="Aduib service token")
-    ADUIB_SERVICE_TIMEOUT: int = Field(default=300,description="Aduib service timeout")
\ No newline at end of file
+    ADUIB_SERVICE_TIMEOUT: int = Field(default=300,description="Aduib service timeout")
+    KNOWLEDGE_CLEAN_SLICE_SIZE: int = Field(default=100, description="Documents sent per knowledge cleanup call")
+    KNOWLEDGE_CLEAN_SLICES_PER_RUN: int = Field(default=10, description="Cleanup calls per knowledge cleanup run")
+    KNOWLEDGE_CLEAN_RATE_LIMIT: float = Field(
+        default=0.5, description="Knowledge cleanup calls per second across all workers, 0 disables the limit"
+    )
+    ADUIB_JOB_CALLBACK_URL: str = Field(
+        default="", description="URL AduibAI posts job updates to (this service's /aduib_job/callback), empty to only poll"
+    )
+    ADUIB_JOB_POLL_INITIAL_DELAY: int = Field(default=5, description="Seconds before the first poll of an AduibAI job")
+    ADUIB_JOB_POLL_MAX_DELAY: int = Field(default=120, description="Maximum seconds between two polls of an AduibAI job")
+    ADUIB_JOB_MAX_AGE: int = Field(default=6 * 60 * 60, description="Seconds after which an unfinished AduibAI job is no longer polled")
+    RAG_RETRY_EXTRACT_TIMEOUT: int = Field(default=30 * 60, description="Seconds after creation a document may take to be extracted before it is retried")
+    RAG_RETRY_SPLIT_TIMEOUT: int = Field(default=30 * 60, description="Seconds after extraction a document may take to be split before it is retried")
+    RAG_RETRY_CLEAN_TIMEOUT: int = Field(default=30 * 60, description="Seconds after splitting a document may take to be cleaned before it is retried")
+    RAG_RETRY_INDEX_TIMEOUT: int = Field(default=60 * 60, description="Seconds after cleaning a document may take to be indexed before it is retried")
+    RAG_RETRY_BATCH_SIZE: int = Field(default=50, description="Documents per RAG retry request")
+    RAG_RETRY_CONCURRENCY: int = Field(default=4, description="RAG retry requests sent concurrently")
+    RAG_RETRY_MAX_DOCUMENTS: int = Field(default=1000, description="Maximum documents retried per run")
+    RAG_RETRY_COOLDOWN: int = Field(default=2 * 60 * 60, description="Seconds before the same document is retried again")
@@ -6,12 +6,14 @@ from pydantic_settings import SettingsConfigDict, BaseSettings, PydanticBaseSett
 
 from .aduib_ai import AduibAiConfig
 from .cache.redis_config import RedisConfig
+from .celery import CeleryConfig
 from .db import DBConfig
 from .deploy import DeploymentConfig, AuthConfig, MCPConfig
 from .halo import HaloConfig
 from .logging import LoggingConfig
 from .remote import RemoteSettingsSource, RemoteSettingsSourceName, RemoteSettingsSourceConfig, DiscoveryConfig
 from .remote.base import NacosSettingsSource
+from .usage import UsageConfig
 
 logger = logging.getLogger(__name__)
 
@@ -63,7 +65,9 @@ class BlogSyncConfig(
     RemoteSettingsSourceConfig,
     DiscoveryConfig,
     HaloConfig,
-    AduibAiConfig
+    AduibAiConfig,
+    UsageConfig,
+    CeleryConfig,
 ):
     model_config = SettingsConfigDict(
         # Use top level .env file (one level above ./aduib_ai/)
@@ -1,6 +1,6 @@
 from typing import Optional
 
-from pydantic import Field, NonNegativeInt, PositiveFloat, PositiveInt
+from pydantic import Field, NonNegativeFloat, NonNegativeInt, PositiveFloat, PositiveInt
 from pydantic_settings import BaseSettings
 
 
@@ -93,3 +93,76 @@ class RedisConfig(BaseSettings):
         description="Enable client side cache in redis",
         default=False,
     )
+
+    REDIS_MAX_CONNECTIONS: Optional[PositiveInt] = Field(
+        description="Maximum connections of the synchronous client pool (per process), unbounded if not set",
+        default=None,
+    )
+
+    REDIS_ASYNC_MAX_CONNECTIONS: Optional[PositiveInt] = Field(
+        description="Maximum connections of the redis.asyncio client pool (per process), unbounded if not set",
+        default=None,
+    )
+
+    REDIS_SOCKET_TIMEOUT: Optional[PositiveFloat] = Field(
+        description="Socket timeout in seconds for Redis commands, bounds how long a call waits on a dead server "
+        "before the local rate limit takes over. Not set waits without limit",
+        default=5.0,
+    )
+
+    REDIS_SOCKET_CONNECT_TIMEOUT: Optional[PositiveFloat] = Field(
+        description="Socket connect timeout in seconds for Redis connections, not set waits without limit",
+        default=2.0,
+    )
+
+    REDIS_HEALTH_CHECK_INTERVAL: NonNegativeInt = Field(
+        description="Seconds a pooled connection may stay idle before it is checked with PING, 0 disables checks",
+        default=0,
+    )
+
+    REDIS_CODEC_SERIALIZER: str = Field(
+        description="Serializer of values written through the cache codec: json, pickle or msgpack (if installed)",
+        default="json",
+    )
+
+    REDIS_CODEC_COMPRESS_THRESHOLD: NonNegativeInt = Field(
+        description="Cached values larger than this many bytes are zlib compressed, 0 disables compression",
+        default=1024,
+    )
+
+    REDIS_CLIENT_SIDE_CACHE_MAX_SIZE: PositiveInt = Field(
+        description="Maximum entries of the client side cache of each connection pool",
+        default=10000,
+    )
+
+    REDIS_CLIENT_SIDE_CACHE_EVICTION_POLICY: str = Field(
+        description="Eviction policy of the client side cache, only LRU is supported by redis-py",
+        default="LRU",
+    )
+
+    REDIS_CLIENT_SIDE_CACHE_COMMANDS: Optional[str] = Field(
+        description="Comma-separated read only commands whose responses are cached client side "
+        "(e.g. GET,HGETALL), defaults to all read only commands supported by redis-py",
+        default=None,
+    )
+
+    REDIS_HEALTH_MONITOR_ENABLED: bool = Field(
+        description="Watch Redis in the background and rebuild the clients after a Sentinel failover "
+        "or repeated connection errors",
+        default=True,
+    )
+
+    REDIS_HEALTH_MONITOR_INTERVAL: PositiveFloat = Field(
+        description="Seconds between two health checks of the Redis health monitor",
+        default=5.0,
+    )
+
+    REDIS_HEALTH_MONITOR_FAILURE_THRESHOLD: PositiveInt = Field(
+        description="Consecutive failed PINGs after which the Redis clients are rebuilt",
+        default=3,
+    )
+
+    REDIS_HEALTH_MONITOR_CLOSE_DELAY: NonNegativeFloat = Field(
+        description="Seconds a replaced Redis client is kept open for calls still using it",
+        default=30.0,
+    )
@@ -0,0 +1,58 @@
+from pydantic import Field, NonNegativeInt, PositiveInt
+from pydantic_settings import BaseSettings
+
+
+class CeleryConfig(BaseSettings):
+    """
+    Configuration settings for celery queues, routing and worker concurrency
+    """
+
+    CELERY_SYNC_QUEUE: str = Field(
+        description="Queue of the time sensitive blog sync task, also the default queue",
+        default="blog_sync",
+    )
+
+    CELERY_RAG_RETRY_QUEUE: str = Field(
+        description="Queue of the RAG retry task, which may wait on the RAG service for minutes",
+        default="blog_rag_retry",
+    )
+
+    CELERY_MAINTENANCE_QUEUE: str = Field(
+        description="Queue of maintenance tasks such as knowledge document cleanup and usage flushes",
+        default="maintenance",
+    )
+
+    CELERY_SYNC_CONCURRENCY: PositiveInt = Field(
+        description="Concurrency of the worker consuming the sync queue",
+        default=4,
+    )
+
+    CELERY_RAG_RETRY_CONCURRENCY: PositiveInt = Field(
+        description="Concurrency of the worker consuming the RAG retry queue",
+        default=2,
+    )
+
+    CELERY_MAINTENANCE_CONCURRENCY: PositiveInt = Field(
+        description="Concurrency of the worker consuming the maintenance queue",
+        default=1,
+    )
+
+    CELERY_SYNC_PRIORITY: NonNegativeInt = Field(
+        description="Priority of sync tasks, 0 is the highest and 9 the lowest with the Redis broker",
+        default=0,
+    )
+
+    CELERY_RAG_RETRY_PRIORITY: NonNegativeInt = Field(
+        description="Priority of RAG retry tasks, 0 is the highest and 9 the lowest with the Redis broker",
+        default=5,
+    )
+
+    CELERY_MAINTENANCE_PRIORITY: NonNegativeInt = Field(
+        description="Priority of maintenance tasks, 0 is the highest and 9 the lowest with the Redis broker",
+        default=9,
+    )
+
+    CELERY_TELEMETRY_LOG_INTERVAL: NonNegativeInt = Field(
+        description="Seconds between the task metrics log lines of each worker process, 0 disables them",
+        default=60,
+    )
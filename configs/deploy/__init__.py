@@ -36,7 +36,42 @@ class DeploymentConfig(BaseSettings):
 
 class AuthConfig(BaseSettings):
     AUTH_ENABLED: bool = Field(default=False, description="Enable authentication")
+    API_KEY_RATE_LIMIT: float = Field(
+        default=0, description="Requests per second allowed for each API key, 0 disables the limit"
+    )
+    API_KEY_RATE_LIMIT_BURST: int = Field(
+        default=0, description="Burst capacity of the per API key limit, defaults to the per second rate"
+    )
+    API_KEY_MAX_ACTIVE_REQUESTS: int = Field(
+        default=0,
+        description="Concurrent requests allowed for each API key across all processes, 0 disables the limit",
+    )
 
 
 class MCPConfig(BaseSettings):
     TRANSPORT_TYPE: str = Field(default="streamable-http", description="MCP transport type (stdio, sse, streamable-http)")
+    MCP_RESULT_JSON_INDENT: int = Field(
+        default=0, ge=0, description="Indentation of tool results serialized to JSON, 0 for compact JSON"
+    )
+    MCP_RESULT_TEXT_CHUNK_SIZE: int = Field(
+        default=0,
+        ge=0,
+        description="Split text tool results longer than this many characters into several text contents, 0 disables it",
+    )
+    MCP_STATELESS_HTTP: bool = Field(
+        default=False,
+        description="Serve every streamable-http request with a fresh transport and keep the sessions in redis, "
+        "so several instances can serve the same sessions without sticky sessions",
+    )
+    MCP_SESSION_TTL: int = Field(
+        default=3600, gt=0, description="Seconds a stateless session is kept in redis after its last request"
+    )
+    MCP_EVENT_STORE_ENABLED: bool = Field(
+        default=False, description="Store streamable-http events in redis so clients can resume dropped streams"
+    )
+    MCP_EVENT_STORE_MAX_LEN: int = Field(
+        default=1000, gt=0, description="Approximate number of events kept per stream for resuming"
+    )
+    MCP_EVENT_STORE_TTL: int = Field(
+        default=3600, gt=0, description="Seconds the events of a stream are kept after its last event"
+    )
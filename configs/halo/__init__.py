@@ -6,4 +6,14 @@ class HaloConfig(BaseSettings):
 
     HALO_BASE_URL: str = Field(default="http://localhost:8080", description="Base URL for the Halo service")
     HALO_API_KEY: str = Field(default="", description="API key for authenticating with the Halo service")
-    HALO_TIMEOUT: int = Field(default=30, description="Timeout in seconds for Halo service requests")
\ No newline at end of file
+    HALO_TIMEOUT: int = Field(default=30, description="Timeout in seconds for Halo service requests")
+    HALO_PUSH_RATE_LIMIT: int = Field(default=0, description="Maximum posts pushed to Halo per minute across all workers, 0 disables the limit")
+
+    BLOG_SYNC_MIN_INTERVAL: int = Field(
+        default=30, description="Seconds between blog sync runs while there is a large backlog, also the beat tick"
+    )
+    BLOG_SYNC_MAX_INTERVAL: int = Field(
+        default=600, description="Seconds between blog sync runs while nothing is pending"
+    )
+    BLOG_SYNC_MIN_BATCH_SIZE: int = Field(default=10, description="Minimum blogs pushed per blog sync run")
+    BLOG_SYNC_MAX_BATCH_SIZE: int = Field(default=200, description="Maximum blogs pushed per blog sync run")
@@ -0,0 +1,28 @@
+from pydantic import Field, PositiveInt
+from pydantic_settings import BaseSettings
+
+
+class UsageConfig(BaseSettings):
+    """
+    Configuration settings for per API key usage metering
+    """
+
+    API_KEY_USAGE_ENABLED: bool = Field(
+        description="Enable per API key usage metering (counters are kept in Redis and flushed to the database)",
+        default=True,
+    )
+
+    API_KEY_USAGE_BUCKET_SECONDS: PositiveInt = Field(
+        description="Width in seconds of the time bucket usage counters are aggregated into",
+        default=60,
+    )
+
+    API_KEY_USAGE_FLUSH_BATCH_SIZE: PositiveInt = Field(
+        description="Maximum number of usage buckets moved from Redis to the database per batch",
+        default=500,
+    )
+
+    API_KEY_USAGE_KEY_TTL: PositiveInt = Field(
+        description="Expiry in seconds of un-flushed usage counters in Redis",
+        default=24 * 60 * 60,
+    )
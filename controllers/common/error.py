@@ -5,6 +5,14 @@ class ApiNotCurrentlyAvailableError(BaseHttpException):
     def __init__(self):
         super().__init__(error_code=403, error_msg="api key is not currently available")
 
+class TooManyRequestsError(BaseHttpException):
+    def __init__(self):
+        super().__init__(error_code=429, error_msg="too many requests, please try again later")
+
+class NotFoundError(BaseHttpException):
+    def __init__(self, message: str = "resource not found"):
+        super().__init__(error_code=404, error_msg=message)
+
 class ServiceError(BaseHttpException):
     def __init__(self, message: str = "service error"):
         super().__init__(error_code=500, error_msg=message)
@@ -0,0 +1,23 @@
+from fastapi import APIRouter
+
+from controllers.common.base import BaseResponse
+from controllers.common.error import NotFoundError
+from controllers.params import AduibJobCallback
+from libs.deps import CurrentApiKeyDep
+from service.aduib_job_service import AduibJobService
+
+router = APIRouter(tags=['aduib_job'],prefix='/aduib_job')
+
+
+@router.post('/callback',response_model=BaseResponse)
+def job_callback(callback:AduibJobCallback,current_key:CurrentApiKeyDep):
+    finished = AduibJobService.update(callback.job_id, callback.status, callback.progress, callback.message)
+    return BaseResponse.ok({"finished": finished})
+
+
+@router.get('/{job_id}',response_model=BaseResponse)
+def get_job(job_id:str,current_key:CurrentApiKeyDep):
+    job = AduibJobService.get(job_id)
+    if job is None:
+        raise NotFoundError(f"job {job_id} not found")
+    return BaseResponse.ok(job)
@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+from starlette.requests import Request
+
+from component.cache.client_side_cache import client_side_cache_stats
+from component.cache.tiered_cache import cache_stats
+from controllers.common.base import BaseResponse
+from libs.deps import CurrentApiKeyDep
+
+router = APIRouter(tags=['metrics'],prefix='/metrics')
+
+
+@router.get('',response_model=BaseResponse)
+def get_metrics(request:Request,current_key:CurrentApiKeyDep):
+    """counters of the serving process, every worker process answers with its own"""
+    mcp = getattr(request.app, "mcp", None)
+    return BaseResponse.ok({
+        "cache": cache_stats(),
+        "client_side_cache": client_side_cache_stats(),
+        "mcp_tools": mcp.tool_stats() if mcp is not None else {},
+    })
@@ -1,2 +1,11 @@
+from typing import Any, Optional
 
+from pydantic import BaseModel
 
+
+class AduibJobCallback(BaseModel):
+    """Status update of an AduibAI job, posted by AduibAI to the callback url"""
+    job_id: str
+    status: str
+    progress: Optional[Any] = None
+    message: Optional[str] = None
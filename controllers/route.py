@@ -1,8 +1,16 @@
 from fastapi import APIRouter
 
 from .auth import api_key
+from .job import aduib_job
+from .metrics import metrics
 
 api_router = APIRouter()
 
 #auth
-api_router.include_router(api_key.router)
\ No newline at end of file
+api_router.include_router(api_key.router)
+
+#aduib job
+api_router.include_router(aduib_job.router)
+
+#metrics
+api_router.include_router(metrics.router)
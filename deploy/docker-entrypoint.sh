@@ -1,11 +1,17 @@
 #!/usr/bin/env bash
 # 容器内启动脚本（已调整为默认启动 celery beat + worker）
 # 用法: 通过环境变量 ROLE 来选择要运行的进程：
-#   ROLE=worker     -> 只启动 celery worker
-#   ROLE=celery     -> 启动 celery beat（后台）和 celery worker（前台）  <-- 默认
+#   ROLE=worker     -> 只启动 celery worker（CELERY_WORKER_QUEUES 为空时消费所有队列）
+#   ROLE=celery     -> 启动 celery beat 和每个队列各一个 celery worker  <-- 默认
 # 可选环境变量：
 #   CELERY_EXTRA_ARGS        -> 额外的 celery worker 参数
 #   CELERY_BEAT_EXTRA_ARGS   -> 额外的 celery beat 参数
+#   CELERY_WORKER_QUEUES     -> ROLE=worker 时消费的队列（逗号分隔）
+#   CELERY_WORKER_CONCURRENCY -> ROLE=worker 时的并发数
+# 队列名与各队列并发数与 configs/celery 保持一致：
+#   CELERY_SYNC_QUEUE / CELERY_SYNC_CONCURRENCY
+#   CELERY_RAG_RETRY_QUEUE / CELERY_RAG_RETRY_CONCURRENCY
+#   CELERY_MAINTENANCE_QUEUE / CELERY_MAINTENANCE_CONCURRENCY
 
 set -euo pipefail
 
@@ -41,12 +47,27 @@ start_celery_beat() {
   log "celery beat pid=$beat_pid"
 }
 
+# 参数: $1 队列（逗号分隔，可为空） $2 并发数（可为空） $3 节点名前缀（可为空）
 start_celery_worker() {
-  log "启动 celery worker"
+  local QUEUES="${1:-}"
+  local CONCURRENCY="${2:-}"
+  local NODE="${3:-}"
+  log "启动 celery worker queues=${QUEUES:-all} concurrency=${CONCURRENCY:-default}"
   # Build the celery worker command with extra args if provided
   local EXTRA_ARGS=()
+  if [ -n "$QUEUES" ]; then
+    EXTRA_ARGS+=("-Q" "$QUEUES")
+  fi
+  if [ -n "$CONCURRENCY" ]; then
+    EXTRA_ARGS+=("-c" "$CONCURRENCY")
+  fi
+  if [ -n "$NODE" ]; then
+    EXTRA_ARGS+=("-n" "${NODE}@%h")
+  fi
   if [ -n "${CELERY_EXTRA_ARGS:-}" ]; then
-    read -ra EXTRA_ARGS <<< "$CELERY_EXTRA_ARGS"
+    local USER_ARGS=()
+    read -ra USER_ARGS <<< "$CELERY_EXTRA_ARGS"
+    EXTRA_ARGS+=("${USER_ARGS[@]}")
   fi
 
   if command -v uv >/dev/null 2>&1; then
@@ -57,32 +78,44 @@ start_celery_worker() {
     CMD=("python" "-m" "celery" "-A" "celery_app" "worker" "-P" "gevent" "-l" "info" ${EXTRA_ARGS[@]+"${EXTRA_ARGS[@]}"})
   fi
 
-  # Log the exact command for debugging, then start worker (foreground)
+  # Log the exact command for debugging, then start worker (background)
   log "运行命令: ${CMD[*]}"
   "${CMD[@]}" &
-  # Update global child_pid variable
-  child_pid=$!
-  log "celery worker pid=$child_pid"
-  wait "$child_pid"
-  return $?
+  child_pids+=($!)
+  log "celery worker pid=$!"
+}
+
+# 每个队列启动独立的 worker，慢任务（RAG 重试、清理）不会占用同步任务的 worker
+start_queue_workers() {
+  start_celery_worker "${CELERY_SYNC_QUEUE:-blog_sync}" "${CELERY_SYNC_CONCURRENCY:-4}" "sync"
+  start_celery_worker "${CELERY_RAG_RETRY_QUEUE:-blog_rag_retry}" "${CELERY_RAG_RETRY_CONCURRENCY:-2}" "rag_retry"
+  start_celery_worker "${CELERY_MAINTENANCE_QUEUE:-maintenance}" "${CELERY_MAINTENANCE_CONCURRENCY:-1}" "maintenance"
+}
+
+# 任一 worker（或 beat）退出即结束容器，由容器的重启策略拉起
+wait_workers() {
+  local status=0
+  wait -n || status=$?
+  warn "celery 子进程退出，status=$status"
+  term_handler "$status"
 }
 
 # Trap and forward signals to child processes
-child_pid=0
+child_pids=()
 beat_pid=0
 term_handler() {
   log "收到终止信号，清理子进程"
-  if [ "$child_pid" -ne 0 ]; then
-    log "发送 SIGTERM 到 worker ($child_pid)"
-    kill -TERM "$child_pid" 2>/dev/null || true
-  fi
+  for pid in ${child_pids[@]+"${child_pids[@]}"}; do
+    log "发送 SIGTERM 到 worker ($pid)"
+    kill -TERM "$pid" 2>/dev/null || true
+  done
   if [ "$beat_pid" -ne 0 ]; then
     log "发送 SIGTERM 到 beat ($beat_pid)"
     kill -TERM "$beat_pid" 2>/dev/null || true
   fi
   # 等待子进程结束
   wait || true
-  exit 0
+  exit "${1:-0}"
 }
 trap term_handler SIGTERM SIGINT
 
@@ -92,12 +125,14 @@ log "容器启动，ROLE=$ROLE"
 
 case "$ROLE" in
   worker)
-    start_celery_worker
+    start_celery_worker "${CELERY_WORKER_QUEUES:-}" "${CELERY_WORKER_CONCURRENCY:-}"
+    wait_workers
     ;;
   celery)
-    # 启动 beat（后台）并启动 worker（前台等待）
+    # 启动 beat 和每个队列的 worker（后台），等待 worker 退出
     start_celery_beat
-    start_celery_worker
+    start_queue_workers
+    wait_workers
     ;;
   *)
     err "未知 ROLE: $ROLE. 支持的值: worker | celery "
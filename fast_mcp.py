@@ -5,17 +5,17 @@ from __future__ import annotations as _annotations
 import inspect
 import logging
 import re
-from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Sequence
+from collections import defaultdict
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Iterator, Sequence
 from contextlib import (
     AbstractAsyncContextManager,
     asynccontextmanager,
 )
-from itertools import chain
-from typing import Any, Generic, Literal
+from typing import TYPE_CHECKING, Any, Generic, Literal
 
 import anyio
 import pydantic_core
-from mcp.server.auth.middleware.auth_context import AuthContextMiddleware
+from mcp.server.auth.middleware.auth_context import AuthContextMiddleware, get_access_token
 from mcp.server.auth.middleware.bearer_auth import (
     BearerAuthBackend,
     RequireAuthMiddleware,
@@ -24,7 +24,7 @@ from mcp.server.auth.provider import OAuthAuthorizationServerProvider
 from mcp.server.auth.settings import (
     AuthSettings, ClientRegistrationOptions, RevocationOptions,
 )
-from mcp.server.fastmcp.exceptions import ResourceError
+from mcp.server.fastmcp.exceptions import ResourceError, ToolError
 from mcp.server.fastmcp.prompts import Prompt, PromptManager
 from mcp.server.fastmcp.resources import FunctionResource, Resource, ResourceManager
 from mcp.server.fastmcp.tools import Tool, ToolManager
@@ -62,8 +62,12 @@ from starlette.responses import Response
 from starlette.routing import Route
 from starlette.types import Receive, Scope, Send
 
+from component.mcp.session_manager import SessionScopedSessionManager
 from configs import config
 
+if TYPE_CHECKING:
+    from component.mcp.session_store import RedisSessionStore
+
 logger=logging.getLogger(__name__)
 
 
@@ -97,7 +101,7 @@ class Settings(BaseSettings, Generic[LifespanResultT]):
     # StreamableHTTP settings
     json_response: bool = False
     stateless_http: bool = (
-        False  # If True, uses true stateless mode (new transport per request)
+        config.MCP_STATELESS_HTTP  # If True, uses true stateless mode (new transport per request)
     )
 
     # resource settings
@@ -105,6 +109,15 @@ class Settings(BaseSettings, Generic[LifespanResultT]):
 
     # tool settings
     warn_on_duplicate_tools: bool = True
+    result_json_indent: int = Field(
+        config.MCP_RESULT_JSON_INDENT,
+        description="Indentation of tool results serialized to JSON, 0 for compact JSON",
+    )
+    result_text_chunk_size: int = Field(
+        config.MCP_RESULT_TEXT_CHUNK_SIZE,
+        description="Split text results longer than this many characters into "
+        "several text contents, 0 to never split",
+    )
 
     # prompt settings
     warn_on_duplicate_prompts: bool = True
@@ -121,6 +134,131 @@ class Settings(BaseSettings, Generic[LifespanResultT]):
     auth: AuthSettings | None = None
 
 
+class ToolLimits(BaseModel):
+    """Execution limits of a tool, declared when registering it with FastMCP.tool().
+
+    Calls beyond the limits are rejected with a ToolError, which clients receive
+    as an MCP tool result with isError set.
+    """
+
+    max_concurrency: int | None = Field(
+        None, description="Maximum concurrent executions, None for unlimited"
+    )
+    max_queue: int = Field(
+        0, description="Maximum calls waiting for a free execution slot"
+    )
+    timeout: float | None = Field(
+        None,
+        description="Execution timeout in seconds. Only async tools can be "
+        "interrupted, sync tools run on the event loop until they return",
+    )
+    max_concurrency_per_client: int | None = Field(
+        None,
+        description="Maximum running and queued calls of a single client, so one "
+        "client can not take all slots",
+    )
+
+
+class ToolOutput(BaseModel):
+    """Serialization of the results of a tool, declared when registering it with FastMCP.tool().
+
+    Fields left to None use the result_* server settings.
+    """
+
+    json_indent: int | None = Field(
+        None, ge=0, description="Indentation of JSON results, 0 for compact JSON"
+    )
+    text_chunk_size: int | None = Field(
+        None,
+        ge=0,
+        description="Split text results longer than this many characters into "
+        "several text contents, 0 to never split",
+    )
+
+
+class ToolLimiter:
+    """Enforces the ToolLimits of one tool and counts active, queued and rejected calls."""
+
+    def __init__(self, name: str, limits: ToolLimits):
+        self.name = name
+        self.limits = limits
+        self._semaphore = (
+            anyio.Semaphore(limits.max_concurrency)
+            if limits.max_concurrency is not None
+            else None
+        )
+        self._client_calls: dict[str, int] = defaultdict(int)
+        self.active = 0
+        self.queued = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+    def _reject(self, reason: str) -> ToolError:
+        self.rejected += 1
+        logger.warning(f"Tool {self.name} call rejected: {reason}")
+        return ToolError(f"Tool {self.name} is busy: {reason}, please retry later")
+
+    @asynccontextmanager
+    async def limit(self, client_id: str | None) -> AsyncIterator[None]:
+        per_client = self.limits.max_concurrency_per_client
+        if (
+            per_client is not None
+            and client_id is not None
+            and self._client_calls.get(client_id, 0) >= per_client
+        ):
+            raise self._reject(f"client limit of {per_client} calls reached")
+        if self._semaphore is not None:
+            if self._semaphore.value == 0 and self.queued >= self.limits.max_queue:
+                raise self._reject(
+                    f"{self.limits.max_concurrency} calls running "
+                    f"and {self.queued} queued"
+                )
+
+        if client_id is not None:
+            self._client_calls[client_id] += 1
+        try:
+            if self._semaphore is not None:
+                # acquire() checkpoints even with a free slot, a call that got one must not count as queued
+                try:
+                    self._semaphore.acquire_nowait()
+                except anyio.WouldBlock:
+                    self.queued += 1
+                    try:
+                        await self._semaphore.acquire()
+                    finally:
+                        self.queued -= 1
+            self.active += 1
+            try:
+                if self.limits.timeout is None:
+                    yield
+                else:
+                    try:
+                        with anyio.fail_after(self.limits.timeout):
+                            yield
+                    except TimeoutError:
+                        self.timed_out += 1
+                        raise ToolError(
+                            f"Tool {self.name} timed out after {self.limits.timeout}s"
+                        )
+            finally:
+                self.active -= 1
+                if self._semaphore is not None:
+                    self._semaphore.release()
+        finally:
+            if client_id is not None:
+                self._client_calls[client_id] -= 1
+                if not self._client_calls[client_id]:
+                    del self._client_calls[client_id]
+
+
 def lifespan_wrapper(
     app: FastMCP,
     lifespan: Callable[[FastMCP], AbstractAsyncContextManager[LifespanResultT]],
@@ -145,6 +283,8 @@ class FastMCP:
         event_store: EventStore | None = None,
         *,
         tools: list[Tool] | None = None,
+        session_store: RedisSessionStore | None = None,
+        version: str | None = None,
         **settings: Any,
     ):
         self.settings = Settings(**settings)
@@ -159,6 +299,7 @@ class FastMCP:
 
         self._mcp_server = MCPServer(
             name=name or "FastMCP",
+            version=version,
             instructions=instructions,
             lifespan=(
                 lifespan_wrapper(self, self.settings.lifespan)
@@ -187,9 +328,14 @@ class FastMCP:
             )
         self._auth_server_provider = auth_server_provider
         self._event_store = event_store
+        self._session_store = session_store
         self._custom_starlette_routes: list[Route] = []
         self.dependencies = self.settings.dependencies
         self._session_manager: StreamableHTTPSessionManager | None = None
+        self._tool_limiters: dict[str, ToolLimiter] = {}
+        self._tool_outputs: dict[str, ToolOutput] = {}
+        # converted tools / resources / templates / prompts, rebuilt after the registry changed
+        self._listings: dict[str, list[Any]] = {}
 
         # Set up MCP protocol handlers
         self._setup_handlers()
@@ -257,8 +403,27 @@ class FastMCP:
         self._mcp_server.get_prompt()(self.get_prompt)
         self._mcp_server.list_resource_templates()(self.list_resource_templates)
 
+    def _listing(self, kind: str, build: Callable[[], list[Any]]) -> list[Any]:
+        """Return the cached listing of a kind, building it on first use.
+
+        The items are shallow copies, callers such as the Nacos server overwrite
+        fields of the listed tools and must not change the cached ones.
+        """
+        listing = self._listings.get(kind)
+        if listing is None:
+            listing = self._listings[kind] = build()
+        return [item.model_copy() for item in listing]
+
+    def _invalidate_listings(self, *kinds: str) -> None:
+        """Drop the cached listings of the given kinds after the registry changed."""
+        for kind in kinds:
+            self._listings.pop(kind, None)
+
     async def list_tools(self) -> list[MCPTool]:
         """List all available tools."""
+        return self._listing("tools", self._build_tool_listing)
+
+    def _build_tool_listing(self) -> list[MCPTool]:
         tools = self._tool_manager.list_tools()
         return [
             MCPTool(
@@ -286,13 +451,38 @@ class FastMCP:
     ) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
         """Call a tool by name with arguments."""
         context = self.get_context()
-        result = await self._tool_manager.call_tool(name, arguments, context=context)
-        converted_result = _convert_to_content(result)
+        limiter = self._tool_limiters.get(name)
+        if limiter is None:
+            result = await self._tool_manager.call_tool(
+                name, arguments, context=context
+            )
+        else:
+            async with limiter.limit(_client_key(context)):
+                result = await self._tool_manager.call_tool(
+                    name, arguments, context=context
+                )
+        output = self._tool_outputs.get(name)
+        json_indent = self.settings.result_json_indent
+        text_chunk_size = self.settings.result_text_chunk_size
+        if output is not None:
+            if output.json_indent is not None:
+                json_indent = output.json_indent
+            if output.text_chunk_size is not None:
+                text_chunk_size = output.text_chunk_size
+        converted_result = _convert_to_content(
+            result, json_indent=json_indent, text_chunk_size=text_chunk_size
+        )
         return converted_result
 
+    def tool_stats(self) -> dict[str, dict[str, int]]:
+        """Active, queued, rejected and timed out calls of the tools registered with limits."""
+        return {name: limiter.stats() for name, limiter in self._tool_limiters.items()}
+
     async def list_resources(self) -> list[MCPResource]:
         """List all available resources."""
+        return self._listing("resources", self._build_resource_listing)
 
+    def _build_resource_listing(self) -> list[MCPResource]:
         resources = self._resource_manager.list_resources()
         return [
             MCPResource(
@@ -305,6 +495,9 @@ class FastMCP:
         ]
 
     async def list_resource_templates(self) -> list[MCPResourceTemplate]:
+        return self._listing("resource_templates", self._build_resource_template_listing)
+
+    def _build_resource_template_listing(self) -> list[MCPResourceTemplate]:
         templates = self._resource_manager.list_templates()
         return [
             MCPResourceTemplate(
@@ -334,6 +527,8 @@ class FastMCP:
         name: str | None = None,
         description: str | None = None,
         annotations: ToolAnnotations | None = None,
+        limits: ToolLimits | None = None,
+        output: ToolOutput | None = None,
     ) -> None:
         """Add a tool to the server.
 
@@ -345,17 +540,26 @@ class FastMCP:
             name: Optional name for the tool (defaults to function name)
             description: Optional description of what the tool does
             annotations: Optional ToolAnnotations providing additional tool information
+            limits: Optional ToolLimits for concurrency, queueing and timeout of the tool
+            output: Optional ToolOutput overriding how the results of the tool are serialized
         """
         logger.debug(f"Adding tool {fn.__name__}")
-        self._tool_manager.add_tool(
+        tool = self._tool_manager.add_tool(
             fn, name=name, description=description, annotations=annotations
         )
+        if limits is not None:
+            self._tool_limiters[tool.name] = ToolLimiter(tool.name, limits)
+        if output is not None:
+            self._tool_outputs[tool.name] = output
+        self._invalidate_listings("tools")
 
     def tool(
         self,
         name: str | None = None,
         description: str | None = None,
         annotations: ToolAnnotations | None = None,
+        limits: ToolLimits | None = None,
+        output: ToolOutput | None = None,
     ) -> Callable[[AnyFunction], AnyFunction]:
         """Decorator to register a tool.
 
@@ -367,12 +571,22 @@ class FastMCP:
             name: Optional name for the tool (defaults to function name)
             description: Optional description of what the tool does
             annotations: Optional ToolAnnotations providing additional tool information
+            limits: Optional ToolLimits for concurrency, queueing and timeout of the tool
+            output: Optional ToolOutput overriding how the results of the tool are serialized
 
         Example:
             @server.tool()
             def my_tool(x: int) -> str:
                 return str(x)
 
+            @server.tool(limits=ToolLimits(max_concurrency=4, max_queue=16, timeout=30))
+            async def slow_tool(x: int) -> str:
+                return str(x)
+
+            @server.tool(output=ToolOutput(json_indent=2))
+            def readable_tool(x: int) -> dict:
+                return {"x": x}
+
             @server.tool()
             def tool_with_context(x: int, ctx: Context) -> str:
                 ctx.info(f"Processing {x}")
@@ -392,7 +606,12 @@ class FastMCP:
 
         def decorator(fn: AnyFunction) -> AnyFunction:
             self.add_tool(
-                fn, name=name, description=description, annotations=annotations
+                fn,
+                name=name,
+                description=description,
+                annotations=annotations,
+                limits=limits,
+                output=output,
             )
             return fn
 
@@ -405,6 +624,7 @@ class FastMCP:
             resource: A Resource instance to add
         """
         self._resource_manager.add_resource(resource)
+        self._invalidate_listings("resources")
 
     def resource(
         self,
@@ -482,6 +702,7 @@ class FastMCP:
                     description=description,
                     mime_type=mime_type,
                 )
+                self._invalidate_listings("resource_templates")
             else:
                 # Register as regular resource
                 resource = FunctionResource.from_function(
@@ -503,6 +724,7 @@ class FastMCP:
             prompt: A Prompt instance to add
         """
         self._prompt_manager.add_prompt(prompt)
+        self._invalidate_listings("prompts")
 
     def prompt(
         self, name: str | None = None, description: str | None = None
@@ -784,11 +1006,12 @@ class FastMCP:
 
         # Create session manager on first call (lazy initialization)
         if self._session_manager is None:
-            self._session_manager = StreamableHTTPSessionManager(
+            self._session_manager = SessionScopedSessionManager(
                 app=self._mcp_server,
                 event_store=self._event_store,
                 json_response=self.settings.json_response,
                 stateless=self.settings.stateless_http,  # Use the stateless setting
+                session_store=self._session_store,
             )
 
         # Create the ASGI handler
@@ -853,6 +1076,9 @@ class FastMCP:
 
     async def list_prompts(self) -> list[MCPPrompt]:
         """List all available prompts."""
+        return self._listing("prompts", self._build_prompt_listing)
+
+    def _build_prompt_listing(self) -> list[MCPPrompt]:
         prompts = self._prompt_manager.list_prompts()
         return [
             MCPPrompt(
@@ -882,26 +1108,67 @@ class FastMCP:
             raise ValueError(str(e))
 
 
+def _client_key(context: Context) -> str | None:
+    """Identify the calling client for per-client limits."""
+    if context._request_context is None:
+        return None
+    if context.client_id:
+        return context.client_id
+    access_token = get_access_token()
+    if access_token is not None:
+        return access_token.token
+    return str(id(context.session))
+
+
 def _convert_to_content(
     result: Any,
+    json_indent: int = 0,
+    text_chunk_size: int = 0,
 ) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
-    """Convert a result to a sequence of content objects."""
-    if result is None:
-        return []
+    """Convert a result to a sequence of content objects.
 
-    if isinstance(result, TextContent | ImageContent | EmbeddedResource):
-        return [result]
+    Nested lists and tuples are flattened in order. Values that are not content
+    objects, images or strings are serialized to JSON, compact unless json_indent
+    is set. Texts longer than text_chunk_size characters are split into several
+    text contents.
+    """
+    contents: list[TextContent | ImageContent | EmbeddedResource] = []
+    # iterators of the lists being flattened, an explicit stack instead of recursion
+    stack: list[Iterator[Any]] = [iter((result,))]
+    while stack:
+        item = next(stack[-1], _END)
+        if item is _END:
+            stack.pop()
+            continue
+
+        if item is None:
+            continue
+
+        if isinstance(item, TextContent | ImageContent | EmbeddedResource):
+            contents.append(item)
+        elif isinstance(item, Image):
+            contents.append(item.to_image_content())
+        elif isinstance(item, list | tuple):
+            stack.append(iter(item))
+        else:
+            if not isinstance(item, str):
+                item = pydantic_core.to_json(
+                    item, fallback=str, indent=json_indent or None
+                ).decode()
+            contents.extend(_text_contents(item, text_chunk_size))
+    return contents
 
-    if isinstance(result, Image):
-        return [result.to_image_content()]
 
-    if isinstance(result, list | tuple):
-        return list(chain.from_iterable(_convert_to_content(item) for item in result))  # type: ignore[reportUnknownVariableType]
+_END = object()
 
-    if not isinstance(result, str):
-        result = pydantic_core.to_json(result, fallback=str, indent=2).decode()
 
-    return [TextContent(type="text", text=result)]
+def _text_contents(text: str, chunk_size: int) -> list[TextContent]:
+    if not chunk_size or len(text) <= chunk_size:
+        return [TextContent(type="text", text=text)]
+    return [
+        TextContent(type="text", text=text[i : i + chunk_size])
+        for i in range(0, len(text), chunk_size)
+    ]
 
 
 class Context(BaseModel, Generic[ServerSessionT, LifespanContextT, RequestT]):
@@ -1,20 +1,28 @@
 import logging
 import time
 from contextvars import ContextVar
-from typing import Callable
+from collections.abc import AsyncIterator
+from typing import Callable, Optional
 
+import anyio
 from fastapi import Depends
 from fastapi.security import APIKeyHeader
 from requests import Response
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
+from starlette.responses import JSONResponse
 
-from controllers.common.error import ApiNotCurrentlyAvailableError
+from component.cache.redis_cache import redis_fallback
+from controllers.common.base import BaseHttpException, BaseResponse
+from controllers.common.error import ApiNotCurrentlyAvailableError, TooManyRequestsError
 from libs.contextVar_wrapper import ContextVarWrappers
 from models import ApiKey
+from configs import config
 from service.api_key_service import ApiKeyService
+from service.api_key_usage_service import ApiKeyUsageService
 from service.error.error import ApiKeyNotFound
-from utils import trace_uuid
+from utils import trace_uuid, AsyncRateLimit, TokenBucketLimit
+from utils.async_utils import async_thread_pool
 
 API_KEY_HEADER = "X-API-Key"  # 你希望客户端发送的 API Key 的请求头字段名称
 api_key_header = APIKeyHeader(name=API_KEY_HEADER)
@@ -33,29 +41,106 @@ def verify_api_key_in_db(api_key: str=Depends(api_key_header)) -> None:
 
 
 
+@redis_fallback(default_return=True)
+async def _acquire_api_key_permit(api_key_id) -> bool:
+    """take a permit of the per API key rate limit, requests are let through while redis is unavailable"""
+    return await TokenBucketLimit(
+        f"api_key:{api_key_id}",
+        rate=config.API_KEY_RATE_LIMIT,
+        capacity=config.API_KEY_RATE_LIMIT_BURST or None,
+    ).async_try_acquire()
+
+
+async def _exit_active_request(rate_limit: AsyncRateLimit, request_id: str):
+    # also runs while the request is being cancelled (client gone), the slot must be released anyway
+    with anyio.CancelScope(shield=True):
+        await rate_limit.exit(request_id)
+
+
+async def _release_after_body(
+    body_iterator: AsyncIterator[bytes], rate_limit: AsyncRateLimit, request_id: str
+) -> AsyncIterator[bytes]:
+    """keep the slot of a request until its (streamed) body is sent"""
+    try:
+        async for chunk in body_iterator:
+            yield chunk
+    finally:
+        await _exit_active_request(rate_limit, request_id)
+
+
 class ApiKeyContextMiddleware(BaseHTTPMiddleware):
     """Middleware to extract and store API Key in request context."""
 
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         api_key_context.clear()
+        start_time = time.perf_counter()
+        api_key = None
+        active_limit = None
+        request_id = None
         api_key_value = request.headers.get(API_KEY_HEADER)
         if api_key_value:
             try:
-                api_key = ApiKeyService.get_by_hash_key(api_key_value)
-                ApiKeyService.validate_api_key(api_key_value)
-                logger.info(f"Using API Key: {api_key}")
-                api_key_context.set(api_key)
-            except ApiKeyNotFound:
-                logger.error(f"API Key not found: {api_key_value}")
-                raise ApiNotCurrentlyAvailableError()
-            except Exception as e:
-                logger.error(f"Invalid API Key: {api_key_value}")
-                raise e
-
-        response: Response = await call_next(request)
-        api_key_context.clear()
+                api_key = self._authenticate(api_key_value)
+                if config.API_KEY_RATE_LIMIT > 0 and not await _acquire_api_key_permit(api_key.id):
+                    logger.warning(f"API Key {api_key.id} exceeded {config.API_KEY_RATE_LIMIT} requests per second")
+                    raise TooManyRequestsError()
+                if config.API_KEY_MAX_ACTIVE_REQUESTS > 0:
+                    # falls back to a per process share of the limit while redis is unavailable
+                    active_limit = AsyncRateLimit(f"api_key:{api_key.id}", config.API_KEY_MAX_ACTIVE_REQUESTS)
+                    try:
+                        request_id = await active_limit.enter()
+                    except ValueError as e:
+                        logger.warning(f"API Key {api_key.id} rejected: {e}")
+                        raise TooManyRequestsError()
+            except BaseHttpException as e:
+                # raised outside of the app, its exception handlers do not see it
+                api_key_context.clear()
+                return JSONResponse(
+                    status_code=e.status_code,
+                    content=BaseResponse(code=e.error_code, msg=e.error_msg, data={}).to_dict(),
+                )
+
+        response: Optional[Response] = None
+        try:
+            response = await call_next(request)
+        except BaseException:
+            if request_id is not None:
+                await _exit_active_request(active_limit, request_id)
+            raise
+        else:
+            if request_id is not None:
+                # a body that is never iterated (client gone before it started) leaves the entry to the
+                # max alive time eviction of the limit
+                response.body_iterator = _release_after_body(response.body_iterator, active_limit, request_id)
+        finally:
+            api_key_context.clear()
+            # requests whose handler raised are counted too, with no response bytes
+            if api_key and config.API_KEY_USAGE_ENABLED:
+                # counters are written to redis off the event loop, the request never waits on them
+                async_thread_pool.submit(
+                    ApiKeyUsageService.record,
+                    api_key.id,
+                    int(request.headers.get("content-length") or 0),
+                    int(response.headers.get("content-length") or 0) if response is not None else 0,
+                    int((time.perf_counter() - start_time) * 1000),
+                )
         return response
 
+    @staticmethod
+    def _authenticate(api_key_value: str) -> ApiKey:
+        try:
+            api_key = ApiKeyService.get_by_hash_key(api_key_value)
+            ApiKeyService.validate_api_key(api_key_value)
+            logger.info(f"Using API Key: {api_key}")
+            api_key_context.set(api_key)
+            return api_key
+        except ApiKeyNotFound:
+            logger.error(f"API Key not found: {api_key_value}")
+            raise ApiNotCurrentlyAvailableError()
+        except Exception as e:
+            logger.error(f"Invalid API Key: {api_key_value}")
+            raise e
+
 class TraceIdContextMiddleware(BaseHTTPMiddleware):
     """Middleware to extract and store Trace ID in request context."""
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
@@ -1,9 +1,11 @@
 from .engine import get_db, engine
 from .base import Base
 from .api_key import ApiKey
+from .api_key_usage import ApiKeyUsage
 
 __all__ = ["get_db",
            "engine",
            "Base",
            "ApiKey",
-              ]
\ No newline at end of file
+           "ApiKeyUsage",
+              ]
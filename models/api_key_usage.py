@@ -0,0 +1,22 @@
+import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer, UniqueConstraint
+
+from models import Base
+
+
+class ApiKeyUsage(Base):
+    __tablename__ = "api_key_usage"
+    __table_args__ = (
+        UniqueConstraint("api_key_id", "bucket_start", name="uq_api_key_usage_bucket"),
+        {"comment": "api key usage table"},
+    )
+    id = Column(Integer, primary_key=True, index=True, comment="usage id")
+    api_key_id = Column(Integer, index=True, nullable=False, comment="api key id")
+    bucket_start = Column(DateTime, index=True, nullable=False, comment="usage bucket start time")
+    request_count = Column(BigInteger, nullable=False, default=0, comment="request count")
+    request_bytes = Column(BigInteger, nullable=False, default=0, comment="request body bytes")
+    response_bytes = Column(BigInteger, nullable=False, default=0, comment="response body bytes")
+    latency_ms = Column(BigInteger, nullable=False, default=0, comment="total request latency in milliseconds")
+    created_at = Column(DateTime, default=datetime.datetime.now, comment="usage create time")
+    updated_at = Column(DateTime, default=datetime.datetime.now, onupdate=datetime.datetime.now, comment="usage update time")
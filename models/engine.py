@@ -1,4 +1,5 @@
 import logging
+import os
 from contextlib import contextmanager
 from typing import Generator, Optional
 
@@ -12,6 +13,10 @@ if config.DB_ENABLED:
     engine = create_engine(config.DATABASE_URI,pool_size=config.POOL_SIZE)
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+    if hasattr(os, "register_at_fork"):
+        # forked workers open their own connections, the pooled ones still belong to the parent
+        os.register_at_fork(after_in_child=lambda: engine.dispose(close=False))
+
     # Dependency
     def get_session()-> Optional[Session]:
         session  = SessionLocal()
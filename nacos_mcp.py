@@ -1,8 +1,10 @@
+import asyncio
 import logging
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import uvicorn
-from mcp import stdio_server
+from maintainer.ai.nacos_mcp_service import NacosAIMaintainerService
+from mcp import stdio_server, types
 from mcp.server.auth.provider import OAuthAuthorizationServerProvider
 from mcp.server.fastmcp.server import lifespan_wrapper
 from mcp.server.fastmcp.tools import Tool
@@ -13,6 +15,9 @@ from nacos_mcp_wrapper.server.nacos_settings import NacosSettings
 
 from fast_mcp import FastMCP
 
+if TYPE_CHECKING:
+    from component.mcp.session_store import RedisSessionStore
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,13 +33,14 @@ class NacosMCP(FastMCP):
                  event_store: EventStore | None = None,
                  *,
                  tools: list[Tool] | None = None,
+                 session_store: "RedisSessionStore | None" = None,
                  version: str | None = None,
                  **settings: Any,
                  ):
         if "host" not in settings:
             settings["host"] = "0.0.0.0"
         super().__init__(name, instructions, auth_server_provider, event_store,
-                         tools=tools, **settings)
+                         tools=tools, session_store=session_store, **settings)
 
         self._mcp_server = NacosServer(
             nacos_settings=nacos_settings,
@@ -48,6 +54,7 @@ class NacosMCP(FastMCP):
 
         # Set up MCP protocol handlers
         self._setup_handlers()
+        self._tools_sync_task: asyncio.Task | None = None
 
     async def run_stdio_async(self) -> None:
         """Run the server using stdio transport."""
@@ -102,3 +109,30 @@ class NacosMCP(FastMCP):
                 await self._mcp_server.register_to_nacos("streamable-http",
                                                          self.settings.port,
                                                          self.settings.streamable_http_path)
+
+    async def sync_tools(self) -> None:
+        """
+        Apply the tool metadata kept in Nacos (enabled flags, description overrides) to this process and keep
+        following it, without registering the instance. Worker processes of a multi-process node call it,
+        the node is registered once by the parent process.
+        """
+        server = self._mcp_server
+        try:
+            server.mcp_service = await NacosAIMaintainerService.create_mcp_service(server._ai_client_config)
+            if types.ListToolsRequest not in server.request_handlers:
+                return
+            await server.init_tools_tmp()
+            server.list_tools()(server._list_tmp_tools)
+            try:
+                server_detail_info = await server.mcp_service.get_mcp_server_detail(
+                    server._nacos_settings.NAMESPACE, server.name, server.version
+                )
+            except Exception as e:
+                # not registered yet, the subscription picks the metadata up once the parent registered it
+                logger.info(f"Can not find McpServer {server.name} {server.version} in nacos: {e}")
+                server_detail_info = None
+            if server_detail_info is not None:
+                server.update_tools(server_detail_info)
+            self._tools_sync_task = asyncio.create_task(server.subscribe())
+        except Exception as e:
+            logger.error(f"Failed to sync tool metadata from nacos: {e}", exc_info=True)
@@ -1,5 +1,9 @@
+import time
 from datetime import datetime
 from celery_app import celery_app
+from configs import config
+from service.aduib_job_service import AduibJobService
+from service.api_key_usage_service import ApiKeyUsageService
 from service.blog_sync_service import BlogSyncService
 import asyncio
 import logging
@@ -9,26 +13,69 @@ logger = logging.getLogger(__name__)
 
 @celery_app.task
 def blog_sync():
-    """打印当前时间（供 Celery 定时任务调用）。"""
+    """按积压量自适应同步博客（供 Celery 定时任务调用，每个 tick 检查是否到期）。"""
     now = datetime.now()
-    # 使用 ISO 格式输出本地时间
-    print(f"[scheduled_tasks.print_time] current time: {now.isoformat()}")
-
     try:
-        BlogSyncService.sync_blogs()
+        interval = BlogSyncService.adaptive_sync()
+        if interval is None:
+            logger.debug("Blog sync is not due yet, skipping this tick")
     except Exception as e:
-        logger.exception("Error while running BlogSyncService.sync_blogs: %s", e)
+        logger.exception("Error while running BlogSyncService.adaptive_sync: %s", e)
 
     return now.isoformat()
 
 
 @celery_app.task
 def blog_rag_retry():
-    """重试博客 RAG 处理失败的任务（供 Celery 定时任务调用）。"""
-    BlogSyncService.blog_rag_retry()
+    """为 RAG 处理停滞的文档提交重试任务（供 Celery 定时任务调用），由 aduib_job_poll 轮询任务进度。"""
+    job_ids = BlogSyncService.blog_rag_retry()
+    submitted_at = time.time()
+    for job_id in job_ids:
+        aduib_job_poll.apply_async(args=(job_id, 0, submitted_at), countdown=AduibJobService.next_poll_delay(0))
+    return job_ids
+
+
+@celery_app.task
+def aduib_job_poll(job_id: str, attempt: int = 0, submitted_at: float | None = None):
+    """
+    轮询 AduibAI 异步任务状态，未结束时按退避间隔重新调度自身。
+    轮询持续失败（Redis 或 AduibAI 不可用）时，任务提交超过 ADUIB_JOB_MAX_AGE 秒后放弃并标记为失败。
+    """
+    # 旧版本调度的消息没有 submitted_at，从本次轮询开始计时
+    submitted_at = submitted_at or time.time()
+    try:
+        finished = AduibJobService.poll(job_id)
+    except Exception as e:
+        logger.warning("Error polling AduibAI job %s: %s", job_id, e)
+        finished = False
+        if time.time() - submitted_at > config.ADUIB_JOB_MAX_AGE:
+            logger.error(
+                "Giving up polling AduibAI job %s after %s attempts, it exceeded ADUIB_JOB_MAX_AGE", job_id, attempt + 1
+            )
+            try:
+                AduibJobService.update(job_id, "failed", message=f"polling failed until ADUIB_JOB_MAX_AGE: {e}")
+            except Exception as update_error:
+                logger.warning("Unable to mark AduibAI job %s as failed: %s", job_id, update_error)
+            return True
+    if not finished:
+        attempt += 1
+        aduib_job_poll.apply_async(
+            args=(job_id, attempt, submitted_at), countdown=AduibJobService.next_poll_delay(attempt)
+        )
+    return finished
 
 
 @celery_app.task
 def clean_knowledge_documents():
     """清理知识文档（供 Celery 定时任务调用）。"""
     BlogSyncService.clean_knowledge_documents()
+
+
+@celery_app.task
+def api_key_usage_flush():
+    """将 Redis 中累计的 API Key 用量批量写入数据库（供 Celery 定时任务调用）。"""
+    if not config.API_KEY_USAGE_ENABLED:
+        return 0
+    flushed = ApiKeyUsageService.flush()
+    logger.info("Flushed %s api key usage buckets", flushed)
+    return flushed
@@ -0,0 +1,182 @@
+"""
+Celery task telemetry collected from signals.
+
+- queue wait: time from publishing a task (stamped in the ``enqueued_at`` message header) to its start,
+  counted from the eta for countdown / eta tasks
+- runtime: time from start to end of the task
+- outcomes: final state of every run (SUCCESS, FAILURE, RETRY, ...) and exception types of failures
+
+The metrics are kept per worker process, ``task_metrics()`` returns them and a background thread of each
+worker process logs them as one JSON line every CELERY_TELEMETRY_LOG_INTERVAL seconds (0 disables it).
+"""
+import bisect
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from celery.signals import (
+    before_task_publish,
+    task_failure,
+    task_postrun,
+    task_prerun,
+    worker_process_init,
+    worker_ready,
+)
+
+logger = logging.getLogger(__name__)
+
+ENQUEUED_AT_HEADER = "enqueued_at"
+
+# upper bounds in seconds of the histogram buckets, the last bucket is unbounded
+_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = _BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """upper bound of the bucket holding the q-quantile, the maximum for the unbounded bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg": round(self.sum / self.count, 4) if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": round(self.max, 4),
+            "buckets": {
+                **{str(le): c for le, c in zip(self.buckets, self.counts)},
+                "+Inf": self.counts[-1],
+            },
+        }
+
+
+class _TaskMetrics:
+    def __init__(self):
+        self.queue_wait = Histogram()
+        self.runtime = Histogram()
+        self.outcomes: dict[str, int] = defaultdict(int)
+        self.exceptions: dict[str, int] = defaultdict(int)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "queue_wait": self.queue_wait.to_dict(),
+            "runtime": self.runtime.to_dict(),
+            "outcomes": dict(self.outcomes),
+            "exceptions": dict(self.exceptions),
+        }
+
+
+_metrics: dict[str, _TaskMetrics] = defaultdict(_TaskMetrics)
+# task id -> start time of the running tasks of this process
+_started_at: dict[str, float] = {}
+_lock = threading.Lock()
+_reporter: Optional[threading.Thread] = None
+
+
+def task_metrics() -> dict[str, dict[str, Any]]:
+    """queue wait and runtime histograms and outcome counters of the tasks run by this process"""
+    with _lock:
+        return {name: metrics.to_dict() for name, metrics in _metrics.items()}
+
+
+def _parse_eta(eta) -> float:
+    """timestamp of the eta of a request, an ISO 8601 string in the message or a datetime"""
+    if isinstance(eta, str):
+        eta = datetime.fromisoformat(eta)
+    if eta.tzinfo is None:
+        eta = eta.replace(tzinfo=timezone.utc)
+    return eta.timestamp()
+
+
+@before_task_publish.connect
+def _stamp_enqueued_at(headers: Optional[dict] = None, **kwargs):
+    if headers is not None:
+        headers.setdefault(ENQUEUED_AT_HEADER, time.time())
+
+
+@task_prerun.connect
+def _on_task_prerun(task_id: str = None, task=None, **kwargs):
+    now = time.time()
+    request = task.request
+    enqueued_at = getattr(request, ENQUEUED_AT_HEADER, None) or (request.headers or {}).get(ENQUEUED_AT_HEADER)
+    if enqueued_at:
+        enqueued_at = float(enqueued_at)
+        # a countdown / eta task only becomes runnable at its eta, the delay asked for is not queue wait
+        if request.eta:
+            enqueued_at = max(enqueued_at, _parse_eta(request.eta))
+    with _lock:
+        _started_at[task_id] = now
+        if enqueued_at:
+            _metrics[task.name].queue_wait.observe(max(now - enqueued_at, 0.0))
+
+
+@task_postrun.connect
+def _on_task_postrun(task_id: str = None, task=None, state: Optional[str] = None, **kwargs):
+    now = time.time()
+    with _lock:
+        started_at = _started_at.pop(task_id, None)
+        metrics = _metrics[task.name]
+        if started_at is not None:
+            metrics.runtime.observe(now - started_at)
+        metrics.outcomes[state or "UNKNOWN"] += 1
+
+
+@task_failure.connect
+def _on_task_failure(sender=None, exception: Optional[BaseException] = None, **kwargs):
+    if sender is None:
+        return
+    with _lock:
+        _metrics[sender.name].exceptions[type(exception).__name__] += 1
+
+
+def _report(interval: float):
+    last = None
+    while True:
+        time.sleep(interval)
+        metrics = task_metrics()
+        # only log when tasks ran since the last line
+        if metrics and metrics != last:
+            logger.info("celery task metrics %s", json.dumps({"ts": int(time.time()), "tasks": metrics}))
+            last = metrics
+
+
+def _start_reporter(**kwargs):
+    from configs import config
+
+    global _reporter
+    if config.CELERY_TELEMETRY_LOG_INTERVAL <= 0 or (_reporter is not None and _reporter.is_alive()):
+        return
+    _reporter = threading.Thread(
+        target=_report, args=(config.CELERY_TELEMETRY_LOG_INTERVAL,), name="celery-task-telemetry", daemon=True
+    )
+    _reporter.start()
+
+
+# prefork pool children run the tasks in their own process, solo / threads / gevent pools in the main one
+worker_process_init.connect(_start_reporter)
+worker_ready.connect(_start_reporter)
@@ -1,5 +1,9 @@
+from .aduib_job_service import AduibJobService
 from .api_key_service import ApiKeyService
+from .api_key_usage_service import ApiKeyUsageService
 
 __all__ = [
+    "AduibJobService",
     "ApiKeyService",
-]
\ No newline at end of file
+    "ApiKeyUsageService",
+]
@@ -0,0 +1,137 @@
+import logging
+import time
+from typing import Any, Callable, Optional
+
+from component.cache.redis_cache import redis_client
+from component.halo.aduib_ai import get_aduib_ai_client
+from component.halo.base import MethodNotAllowedError, ResourceNotFoundError
+from configs import config
+
+logger = logging.getLogger(__name__)
+
+
+class AduibJobService:
+    """
+    AduibAI Job Service
+
+    Long running AduibAI operations (e.g. the RAG retry) are submitted as jobs and tracked in redis.
+    Their status is updated by polling with backoff (see ``scheduled_tasks.aduib_job_poll``) or by the
+    callback AduibAI posts to ``/aduib_job/callback``, whichever comes first.
+    """
+    _JOB_KEY = "aduib_ai:aduib_job:{}"
+    _ACTIVE_JOBS_KEY = "aduib_ai:aduib_job:active"
+    TERMINAL_STATUSES = frozenset({"completed", "succeeded", "success", "failed", "error", "cancelled"})
+
+    @staticmethod
+    def _unwrap(result: dict[str, Any]) -> dict[str, Any]:
+        # AduibAI wraps payloads as {"code": ..., "msg": ..., "data": {...}}
+        data = result.get("data")
+        return data if isinstance(data, dict) else result
+
+    @staticmethod
+    def submit(
+        kind: str,
+        path: str,
+        payload: Optional[dict[str, Any]] = None,
+        fallback: Optional[Callable[[], Any]] = None,
+    ) -> Optional[str]:
+        """
+        submit an AduibAI job and start tracking it
+
+        :param fallback: the synchronous request to send instead when AduibAI answers the submit with 404 / 405
+        :return: the job id, None if AduibAI ran the request synchronously (no job id in the response)
+        """
+        try:
+            result = get_aduib_ai_client().submit_job(
+                path, json=payload, callback_url=config.ADUIB_JOB_CALLBACK_URL or None
+            )
+        except (ResourceNotFoundError, MethodNotAllowedError) as e:
+            if fallback is None:
+                raise
+            # AduibAI does not accept job submits on this path yet, keep using the synchronous request
+            logger.warning(f"AduibAI rejected {kind} as a job ({e}), falling back to the synchronous request")
+            result = fallback()
+            logger.info(f"AduibAI {kind} completed synchronously, result: {result}")
+            return None
+        data = AduibJobService._unwrap(result)
+        job_id = data.get("job_id")
+        if not job_id:
+            logger.info(f"AduibAI {kind} completed synchronously, result: {result}")
+            return None
+        job_id = str(job_id)
+        now = int(time.time())
+        job_key = AduibJobService._JOB_KEY.format(job_id)
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.hset(job_key, mapping={
+            "kind": kind,
+            "status": str(data.get("status") or "submitted"),
+            "progress": str(data.get("progress") or 0),
+            "submitted_at": now,
+            "updated_at": now,
+        })
+        pipe.expire(job_key, config.ADUIB_JOB_MAX_AGE * 2)
+        pipe.sadd(AduibJobService._ACTIVE_JOBS_KEY, job_id)
+        pipe.execute()
+        logger.info(f"AduibAI {kind} submitted as job {job_id}")
+        return job_id
+
+    @staticmethod
+    def get(job_id: str) -> Optional[dict[str, str]]:
+        """tracked state of a job, None if it is unknown or expired"""
+        values = redis_client.hgetall(AduibJobService._JOB_KEY.format(job_id))
+        if not values:
+            return None
+        return {k.decode("utf-8"): v.decode("utf-8") for k, v in values.items()}
+
+    @staticmethod
+    def update(job_id: str, status: str, progress: Any = None, message: Optional[str] = None) -> bool:
+        """
+        record a status update of a tracked job
+
+        :return: True if the job reached a terminal status
+        """
+        job_key = AduibJobService._JOB_KEY.format(job_id)
+        if not redis_client.exists(job_key):
+            logger.warning(f"Ignoring update of unknown AduibAI job {job_id}")
+            return True
+        status = str(status).lower()
+        mapping = {"status": status, "updated_at": int(time.time())}
+        if progress is not None:
+            mapping["progress"] = str(progress)
+        if message:
+            mapping["message"] = str(message)[:1024]
+        terminal = status in AduibJobService.TERMINAL_STATUSES
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.hset(job_key, mapping=mapping)
+        if terminal:
+            pipe.srem(AduibJobService._ACTIVE_JOBS_KEY, job_id)
+        pipe.execute()
+        if terminal:
+            logger.info(f"AduibAI job {job_id} finished with status {status}")
+        return terminal
+
+    @staticmethod
+    def poll(job_id: str) -> bool:
+        """
+        fetch the status of a job from AduibAI
+
+        :return: True if the job needs no more polling (finished, unknown, too old or not known by AduibAI)
+        """
+        job = AduibJobService.get(job_id)
+        if job is None or job.get("status") in AduibJobService.TERMINAL_STATUSES:
+            return True
+        if time.time() - int(job.get("submitted_at", 0)) > config.ADUIB_JOB_MAX_AGE:
+            return AduibJobService.update(job_id, "cancelled", message="stopped polling, job exceeded ADUIB_JOB_MAX_AGE")
+        try:
+            data = AduibJobService._unwrap(get_aduib_ai_client().get_job(job_id))
+        except (ResourceNotFoundError, MethodNotAllowedError) as e:
+            # the job expired on AduibAI or the server has no job API, polling again can not succeed
+            return AduibJobService.update(job_id, "failed", message=f"job status is not available: {e}")
+        return AduibJobService.update(
+            job_id, data.get("status") or job.get("status"), data.get("progress"), data.get("message")
+        )
+
+    @staticmethod
+    def next_poll_delay(attempt: int) -> int:
+        """exponential backoff between polls, bounded by ADUIB_JOB_POLL_MAX_DELAY"""
+        return min(config.ADUIB_JOB_POLL_INITIAL_DELAY * 2 ** min(attempt, 16), config.ADUIB_JOB_POLL_MAX_DELAY)
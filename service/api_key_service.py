@@ -1,5 +1,6 @@
 from typing import Optional
 
+from component.cache.tiered_cache import cached
 from models.api_key import ApiKey
 from models.engine import get_db
 from utils.api_key import generate_api_key, hash_api_key, verify_api_key
@@ -11,9 +12,11 @@ class ApiKeyService:
     Api Key Service
     """
     @staticmethod
+    @cached(ttl=300, local_ttl=30, name="api_key:validate")
     def validate_api_key(api_hash_key: str) -> Optional[bool]:
         """
-        validate the api key
+        validate the api key, the bcrypt check is cached so that it does not run on every request.
+        rejected keys raise and are never cached, deleted keys may pass for up to local_ttl in other processes.
         """
         with get_db() as session:
             api_Key_model = session.query(ApiKey).filter(ApiKey.hash_key == api_hash_key).first()
@@ -69,8 +72,11 @@ class ApiKeyService:
         delete the api key
         """
         with get_db() as session:
-            session.delete(session.query(ApiKey).filter(ApiKey.api_key == api_key).first())
+            api_key_model = session.query(ApiKey).filter(ApiKey.api_key == api_key).first()
+            api_hash_key = api_key_model.hash_key
+            session.delete(api_key_model)
             session.commit()
+        ApiKeyService.validate_api_key.invalidate(api_hash_key)
 
     @staticmethod
     def delete_by_hash_key(api_hash_key:str):
@@ -80,3 +86,4 @@ class ApiKeyService:
         with get_db() as session:
             session.delete(session.query(ApiKey).filter(ApiKey.hash_key == api_hash_key).first())
             session.commit()
+        ApiKeyService.validate_api_key.invalidate(api_hash_key)
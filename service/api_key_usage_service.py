@@ -0,0 +1,135 @@
+import logging
+import time
+from datetime import datetime
+
+from sqlalchemy.dialects.postgresql import insert
+
+from component.cache.redis_batch import RedisBatch
+from component.cache.redis_cache import redis_client, redis_fallback
+from configs import config
+from models.api_key_usage import ApiKeyUsage
+from models.engine import get_db
+
+logger = logging.getLogger(__name__)
+
+
+class ApiKeyUsageService:
+    """
+    Api Key Usage Service
+
+    Usage is counted in Redis on the request path (one pipelined round trip, no database access)
+    and moved to the ``api_key_usage`` table in batches by a periodic flush.
+    """
+    _USAGE_KEY = "aduib_ai:usage:{}:{}"
+    _PENDING_USAGE_KEY = "aduib_ai:usage:pending"
+    _USAGE_FIELDS = ("request_count", "request_bytes", "response_bytes", "latency_ms")
+
+    @staticmethod
+    @redis_fallback()
+    def record(api_key_id: int, request_bytes: int, response_bytes: int, latency_ms: int) -> None:
+        """
+        increment the usage counters of the api key in the current time bucket
+        """
+        bucket_seconds = config.API_KEY_USAGE_BUCKET_SECONDS
+        bucket = int(time.time()) // bucket_seconds * bucket_seconds
+        usage_key = ApiKeyUsageService._USAGE_KEY.format(api_key_id, bucket)
+
+        batch = RedisBatch()
+        batch.hincrby(usage_key, "request_count", 1)
+        batch.hincrby(usage_key, "request_bytes", max(request_bytes, 0))
+        batch.hincrby(usage_key, "response_bytes", max(response_bytes, 0))
+        batch.hincrby(usage_key, "latency_ms", max(latency_ms, 0))
+        batch.expire(usage_key, config.API_KEY_USAGE_KEY_TTL)
+        batch.sadd(ApiKeyUsageService._PENDING_USAGE_KEY, usage_key)
+        batch.execute()
+
+    @staticmethod
+    def flush(batch_size: int | None = None) -> int:
+        """
+        move the pending usage counters from redis to the database
+
+        :return: number of usage buckets written
+        """
+        if not config.DB_ENABLED:
+            # the counters stay in redis until API_KEY_USAGE_KEY_TTL, a flush with the database enabled picks them up
+            logger.debug("Database is not enabled, skipping the api key usage flush")
+            return 0
+        batch_size = batch_size or config.API_KEY_USAGE_FLUSH_BATCH_SIZE
+        flushed = 0
+        while True:
+            usage_keys = redis_client.spop(ApiKeyUsageService._PENDING_USAGE_KEY, batch_size)
+            if not usage_keys:
+                break
+            counters = ApiKeyUsageService._drain(usage_keys)
+            if not counters:
+                continue
+            try:
+                ApiKeyUsageService._save(counters)
+            except Exception as e:
+                logger.error(f"Error saving api key usage, restoring counters to redis: {e}")
+                ApiKeyUsageService._restore(counters)
+                raise
+            flushed += len(counters)
+        return flushed
+
+    @staticmethod
+    def _drain(usage_keys: list[bytes]) -> dict[str, dict[str, int]]:
+        """
+        read and delete the counters atomically. an increment racing the flush recreates the same bucket key
+        and marks it pending again, the next flush adds it to the row written now through the upsert.
+        """
+        batch = RedisBatch(transaction=True)
+        for usage_key in usage_keys:
+            batch.hgetall(usage_key).delete(usage_key)
+        results = batch.execute()
+
+        counters: dict[str, dict[str, int]] = {}
+        for usage_key, values in zip(usage_keys, results[::2]):
+            if not values:
+                continue
+            key = usage_key.decode("utf-8") if isinstance(usage_key, bytes) else usage_key
+            counters[key] = {
+                (k.decode("utf-8") if isinstance(k, bytes) else k): int(v) for k, v in values.items()
+            }
+        return counters
+
+    @staticmethod
+    def _save(counters: dict[str, dict[str, int]]) -> None:
+        rows = []
+        for usage_key, values in counters.items():
+            api_key_id, bucket = usage_key.rsplit(":", 2)[-2:]
+            rows.append(
+                {
+                    "api_key_id": int(api_key_id),
+                    "bucket_start": datetime.fromtimestamp(int(bucket)),
+                    **{field: values.get(field, 0) for field in ApiKeyUsageService._USAGE_FIELDS},
+                }
+            )
+
+        stmt = insert(ApiKeyUsage).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ApiKeyUsage.api_key_id, ApiKeyUsage.bucket_start],
+            set_={
+                **{
+                    field: getattr(ApiKeyUsage, field) + getattr(stmt.excluded, field)
+                    for field in ApiKeyUsageService._USAGE_FIELDS
+                },
+                "updated_at": datetime.now(),
+            },
+        )
+        with get_db() as session:
+            if session is None:
+                raise RuntimeError("Database is not enabled, api key usage can not be saved")
+            session.execute(stmt)
+            session.commit()
+
+    @staticmethod
+    @redis_fallback()
+    def _restore(counters: dict[str, dict[str, int]]) -> None:
+        batch = RedisBatch()
+        for usage_key, values in counters.items():
+            for field, value in values.items():
+                batch.hincrby(usage_key, field, value)
+            batch.expire(usage_key, config.API_KEY_USAGE_KEY_TTL)
+            batch.sadd(ApiKeyUsageService._PENDING_USAGE_KEY, usage_key)
+        batch.execute()
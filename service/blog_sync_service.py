@@ -1,28 +1,51 @@
+import json
 import logging
-from datetime import datetime
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from typing import Any, Dict
 from typing import Optional
 
 from halo_mcp_server.tools.post_tools import markdown_to_html
+from redis.commands.core import Script
 from slugify import slugify
+from sqlalchemy import and_, func, or_
 
+from component.cache.redis_batch import RedisBatch
+from component.cache.redis_cache import redis_client, redis_fallback
 from component.halo.aduib_ai import get_aduib_ai_client
+from component.halo.base import MethodNotAllowedError, ResourceNotFoundError
 from component.halo.halo_client import HaloClient, get_halo_client
+from configs import config
 from models import get_db
 from models.document import KnowledgeDocument
+from service.aduib_job_service import AduibJobService
+from utils.throughput_limit import SlidingWindowLimit, TokenBucketLimit
 
 logger = logging.getLogger(__name__)
 
+# KEYS[1]: lock key, ARGV[1]: token of the holder
+# deletes the lock only while it is still held with this token, a lock that expired and was taken by
+# another run is left alone
+_RELEASE_LOCK_SCRIPT = b"""
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
 def create_post(client: HaloClient, args: Dict[str, Any]) -> Optional[str]:
     """
     创建一篇新文章。
 
     参数:
         client: Halo API 客户端
-        args: 工具参数
+        args: 工具参数，可通过 name 指定文章名称（metadata.name）
 
     返回:
-        操作结果消息
+        文章名称
     """
     try:
         title = args.get("title")
@@ -44,7 +67,7 @@ def create_post(client: HaloClient, args: Dict[str, Any]) -> Optional[str]:
                 "apiVersion": "content.halo.run/v1alpha1",
                 "kind": "Post",
                 "metadata": {
-                    "name": f"post-{datetime.now().strftime('%Y%m%d%H%M%S')}",
+                    "name": args.get("name") or f"post-{datetime.now().strftime('%Y%m%d%H%M%S')}",
                     "annotations": {},
                 },
                 "spec": {
@@ -87,32 +110,215 @@ def create_post(client: HaloClient, args: Dict[str, Any]) -> Optional[str]:
 
         # 若请求则立即发布
         if args.get("publish_immediately", False):
-            client.put(
-                f"/apis/api.console.halo.run/v1alpha1/posts/{post_name}/publish",
-                params={"async": "true"},
-            )
+            client.publish_post(post_name)
+
+        return post_name
 
     except Exception as e:
         logger.error(f"创建文章出错：{e}", exc_info=True)
         raise e
 
 class BlogSyncService:
+    # write-ahead checkpoints of pushes to Halo: document id -> {"post_name": ..., "started_at": ...}
+    # written before the post is created and removed after push_status is committed
+    _IN_DOUBT_KEY = "aduib_ai:blog_sync:in_doubt"
+    # set while the next sync run is not due yet, its ttl is the current interval
+    _NEXT_RUN_KEY = "aduib_ai:blog_sync:next_run"
+    _INTERVAL_KEY = "aduib_ai:blog_sync:interval"
+
+    @staticmethod
+    def _pending_blogs_filter():
+        return (
+            KnowledgeDocument.push_status == 0,
+            KnowledgeDocument.rag_status == 'completed',
+            KnowledgeDocument.rag_type == 'paragraph',
+            KnowledgeDocument.push_count < 3,
+        )
+
+    @staticmethod
+    def probe_backlog() -> tuple[int, float]:
+        """
+        count the blogs waiting to be pushed with one aggregate query
+
+        :return: number of pending blogs and age in seconds of the oldest one (0 if none)
+        """
+        with get_db() as session:
+            pending, oldest = session.query(
+                func.count(KnowledgeDocument.id), func.min(KnowledgeDocument.updated_at)
+            ).filter(*BlogSyncService._pending_blogs_filter()).one()
+        oldest_age = max((datetime.now() - oldest).total_seconds(), 0.0) if oldest else 0.0
+        return pending or 0, oldest_age
+
+    @staticmethod
+    def next_schedule(pending: int, oldest_age: float, last_interval: Optional[float]) -> tuple[int, int]:
+        """
+        derive the interval until the next run and the batch size of this run from the backlog
+
+        Nothing pending: the interval doubles up to BLOG_SYNC_MAX_INTERVAL.
+        A full batch pending, or blogs waiting longer than BLOG_SYNC_MAX_INTERVAL: BLOG_SYNC_MIN_INTERVAL.
+        In between the interval shrinks linearly with the backlog.
+
+        :return: seconds until the next run, blogs to push in this run
+        """
+        min_interval, max_interval = config.BLOG_SYNC_MIN_INTERVAL, config.BLOG_SYNC_MAX_INTERVAL
+        min_batch, max_batch = config.BLOG_SYNC_MIN_BATCH_SIZE, config.BLOG_SYNC_MAX_BATCH_SIZE
+        if pending <= 0:
+            interval = min((last_interval or min_interval) * 2, max_interval)
+            return int(max(interval, min_interval)), min_batch
+        batch_size = min(max(pending, min_batch), max_batch)
+        if pending >= max_batch or oldest_age >= max_interval:
+            return min_interval, batch_size
+        interval = max_interval - (max_interval - min_interval) * pending / max_batch
+        return int(min(max(interval, min_interval), max_interval)), batch_size
+
+    @staticmethod
+    @redis_fallback(default_return=True)
+    def _claim_run() -> bool:
+        """claim the run so overlapping ticks skip it, the claim expires if the worker dies"""
+        return bool(redis_client.set(
+            BlogSyncService._NEXT_RUN_KEY, int(time.time()), nx=True, ex=config.BLOG_SYNC_MAX_INTERVAL
+        ))
+
+    @staticmethod
+    @redis_fallback()
+    def _last_interval() -> Optional[float]:
+        value = redis_client.get(BlogSyncService._INTERVAL_KEY)
+        return float(value) if value else None
+
+    @staticmethod
+    @redis_fallback()
+    def _schedule_next_run(interval: int):
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.set(BlogSyncService._NEXT_RUN_KEY, int(time.time()) + interval, ex=interval)
+        pipe.set(BlogSyncService._INTERVAL_KEY, interval, ex=config.BLOG_SYNC_MAX_INTERVAL * 2)
+        pipe.execute()
+
+    @staticmethod
+    def adaptive_sync() -> Optional[int]:
+        """
+        run a blog sync if it is due, called on every beat tick (BLOG_SYNC_MIN_INTERVAL)
+
+        :return: the interval until the next run, None if this tick was skipped
+        """
+        if not BlogSyncService._claim_run():
+            return None
+        interval = config.BLOG_SYNC_MIN_INTERVAL
+        try:
+            pending, oldest_age = BlogSyncService.probe_backlog()
+            interval, batch_size = BlogSyncService.next_schedule(
+                pending, oldest_age, BlogSyncService._last_interval()
+            )
+            logger.info(
+                f"Blog sync backlog: {pending} pending, oldest {oldest_age:.0f}s, "
+                f"batch size {batch_size}, next run in {interval}s"
+            )
+            if pending:
+                BlogSyncService.sync_blogs(batch_size)
+        finally:
+            # the next run is timed from the end of this one, so runs never overlap
+            BlogSyncService._schedule_next_run(interval)
+        return interval
+
+    @staticmethod
+    def post_name(blog: KnowledgeDocument) -> str:
+        """deterministic Halo post name of a document, so a retried push can find an earlier one"""
+        return f"post-{blog.id.hex}"
+
+    @staticmethod
+    def _checkpoint(blog: KnowledgeDocument, post_name: str):
+        # not guarded by redis_fallback: without the checkpoint a crash could publish the blog twice
+        redis_client.hset(
+            BlogSyncService._IN_DOUBT_KEY,
+            str(blog.id),
+            json.dumps({"post_name": post_name, "started_at": int(time.time())}),
+        )
+
+    @staticmethod
+    @redis_fallback()
+    def _settle(*blog_ids: str):
+        redis_client.hdel(BlogSyncService._IN_DOUBT_KEY, *blog_ids)
+
+    @staticmethod
+    def _mark_pushed(session, blog: KnowledgeDocument):
+        blog.push_status = 1
+        blog.push_count = blog.push_count + 1
+        blog.push_time = datetime.now()
+        session.add(blog)
+        session.commit()
+
     @staticmethod
-    def sync_blogs():
+    def reconcile_in_doubt(session, halo_client: HaloClient) -> set[str]:
+        """
+        resolve the pushes a previous run started but never settled, by asking Halo whether the post exists
+
+        - the document is already marked pushed: the run died after the commit, drop the checkpoint
+        - the post exists on Halo: publish it if needed and mark the document pushed
+        - the post does not exist: drop the checkpoint, the document is pushed again normally
+
+        :return: ids of the documents still in doubt (Halo unreachable, or the push may still be running in
+                 another worker), the current run skips them
+        """
+        unresolved: set[str] = set()
+        for blog_id, raw in redis_client.hgetall(BlogSyncService._IN_DOUBT_KEY).items():
+            blog_id = blog_id.decode("utf-8") if isinstance(blog_id, bytes) else blog_id
+            try:
+                checkpoint = json.loads(raw)
+                post_name = checkpoint["post_name"]
+                blog = session.get(KnowledgeDocument, uuid.UUID(blog_id))
+            except (ValueError, KeyError) as e:
+                logger.warning(f"Dropping invalid blog sync checkpoint {blog_id}: {e}")
+                BlogSyncService._settle(blog_id)
+                continue
+            # a push younger than two request timeouts may still be in progress
+            if time.time() - checkpoint.get("started_at", 0) < config.HALO_TIMEOUT * 2:
+                unresolved.add(blog_id)
+                continue
+            if blog is None or blog.push_status == 1:
+                BlogSyncService._settle(blog_id)
+                continue
+            try:
+                post = halo_client.get_post(post_name)
+                if post is not None:
+                    if not post.get("spec", {}).get("publish"):
+                        halo_client.publish_post(post_name)
+                    logger.info(f"Blog {blog.title} was pushed as {post_name} by an interrupted run, marking it pushed")
+                    BlogSyncService._mark_pushed(session, blog)
+            except Exception as e:
+                logger.warning(f"Unable to reconcile the push of blog {blog_id}, skipping it in this run: {e}")
+                session.rollback()
+                unresolved.add(blog_id)
+                continue
+            BlogSyncService._settle(blog_id)
+        return unresolved
+
+    @staticmethod
+    def sync_blogs(batch_size: Optional[int] = None):
         # Placeholder for blog synchronization logic
         logger.info("Starting blog synchronization...")
         halo_client_ = get_halo_client()
+        # paces pushes across all workers so a backlog can not flood Halo
+        push_limit = SlidingWindowLimit("halo:push", limit=config.HALO_PUSH_RATE_LIMIT, window=60) \
+            if config.HALO_PUSH_RATE_LIMIT > 0 else None
         with get_db() as session:
-                blog_list:list[KnowledgeDocument] = session.query(KnowledgeDocument).filter(KnowledgeDocument.push_status==0,
-                                                                                               KnowledgeDocument.rag_status=='completed',
-                                                                                               KnowledgeDocument.rag_type=='paragraph',
-                                                                                               KnowledgeDocument.push_count<3
-                                                                                               ).all()
+                in_doubt = BlogSyncService.reconcile_in_doubt(session, halo_client_)
+                query = session.query(KnowledgeDocument).filter(*BlogSyncService._pending_blogs_filter())
+                if in_doubt:
+                    query = query.filter(KnowledgeDocument.id.notin_([uuid.UUID(i) for i in in_doubt]))
+                if batch_size:
+                    # oldest first, so a large backlog is drained in order across runs
+                    query = query.order_by(KnowledgeDocument.updated_at).limit(batch_size)
+                blog_list: list[KnowledgeDocument] = query.all()
                 for blog in blog_list:
+                    if push_limit and not push_limit.acquire(timeout=push_limit.window):
+                        logger.info("Halo push rate limit reached, leaving the remaining blogs to the next run")
+                        break
                     try:
                         # Simulate synchronization process
                         logger.info(f"Synchronizing blog: {blog.title}")
+                        post_name = BlogSyncService.post_name(blog)
+                        BlogSyncService._checkpoint(blog, post_name)
                         create_post(halo_client_,{
+                            "name": post_name,
                             "title": blog.title,
                             "content": blog.content,
                             "content_format": "MARKDOWN",
@@ -121,37 +327,218 @@ class BlogSyncService:
                             "publish_immediately": True
                         })
                         # Update push_status to 1 (synchronized)
-                        blog.push_status = 1
-                        blog.push_count=blog.push_count+1
-                        blog.push_time=datetime.now()
-                        session.add(blog)
-                        session.commit()
+                        BlogSyncService._mark_pushed(session, blog)
+                        BlogSyncService._settle(str(blog.id))
                         logger.info("Blog synchronization completed successfully.")
                     except Exception as e:
                         logger.error(f"Error during blog synchronization: {e}")
                         session.rollback()
 
+    # set per document while its RAG retry is cooling down
+    _RAG_RETRY_COOLDOWN_KEY = "aduib_ai:rag_retry:{}"
+
     @staticmethod
-    def blog_rag_retry():
+    def stuck_documents(limit: int) -> list[uuid.UUID]:
+        """
+        ids of the paragraph documents whose RAG pipeline stalled: not completed, and the next stage after the
+        last finished one (extract, split, clean, index) did not happen within its RAG_RETRY_*_TIMEOUT.
+        Only paragraph documents are returned, the retry endpoint runs the paragraph pipeline.
+        """
+        now = datetime.now()
+
+        def older_than(column, seconds: int):
+            return column < now - timedelta(seconds=seconds)
+
+        doc = KnowledgeDocument
+        with get_db() as session:
+            rows = session.query(doc.id).filter(
+                or_(doc.rag_status.is_(None), doc.rag_status != 'completed'),
+                doc.rag_type == 'paragraph',
+                doc.deleted == 0,
+                or_(
+                    and_(doc.extracted_at.is_(None), older_than(doc.created_at, config.RAG_RETRY_EXTRACT_TIMEOUT)),
+                    and_(doc.extracted_at.isnot(None), doc.spited_at.is_(None),
+                         older_than(doc.extracted_at, config.RAG_RETRY_SPLIT_TIMEOUT)),
+                    and_(doc.spited_at.isnot(None), doc.cleaned_at.is_(None),
+                         older_than(doc.spited_at, config.RAG_RETRY_CLEAN_TIMEOUT)),
+                    and_(doc.cleaned_at.isnot(None), older_than(
+                        func.coalesce(doc.indexed_at, doc.cleaned_at), config.RAG_RETRY_INDEX_TIMEOUT)),
+                ),
+            ).order_by(doc.updated_at).limit(limit).all()
+        return [row.id for row in rows]
+
+    @staticmethod
+    @redis_fallback(default_return=[])
+    def _claim_rag_retries(document_ids: list[uuid.UUID]) -> list[uuid.UUID]:
+        """skip the documents retried within RAG_RETRY_COOLDOWN, one round trip for all of them"""
+        batch = RedisBatch()
+        for document_id in document_ids:
+            batch.set(BlogSyncService._RAG_RETRY_COOLDOWN_KEY.format(document_id), 1,
+                      nx=True, ex=config.RAG_RETRY_COOLDOWN)
+        return [document_id for document_id, claimed in zip(document_ids, batch.execute()) if claimed]
+
+    @staticmethod
+    def blog_rag_retry() -> list[str]:
+        """
+        request RAG retries for the stalled documents only, in batches of RAG_RETRY_BATCH_SIZE sent
+        RAG_RETRY_CONCURRENCY at a time as AduibAI jobs, the worker does not wait for the retries to finish
+
+        :return: ids of the submitted jobs to poll
+        """
         logger.info("Starting blog RAG Retry")
-        ai_client_ = get_aduib_ai_client()
         try:
-            # Simulate synchronization process
-            logger.info(f"Retrying RAG for blog")
-            result = ai_client_.get(path="/v1/knowledge/rag/paragraph/retry")
-            logger.info(f"Blog RAG Retry completed successfully, result: {result}")
+            document_ids = BlogSyncService._claim_rag_retries(
+                BlogSyncService.stuck_documents(config.RAG_RETRY_MAX_DOCUMENTS)
+            )
         except Exception as e:
-            logger.error(f"Error during blog RAG Retry: {e}")
+            logger.error(f"Error finding the documents to retry RAG for: {e}")
+            return []
+        if not document_ids:
+            logger.info("No stalled RAG documents to retry")
+            return []
+
+        batch_size = config.RAG_RETRY_BATCH_SIZE
+        batches = [document_ids[i:i + batch_size] for i in range(0, len(document_ids), batch_size)]
+
+        # the synchronous retry endpoint retries every stalled document, send it once per run
+        sync_retry_lock = threading.Lock()
+        sync_retry_sent = False
 
+        def sync_retry():
+            nonlocal sync_retry_sent
+            with sync_retry_lock:
+                if sync_retry_sent:
+                    return None
+                result = get_aduib_ai_client().get(path="/v1/knowledge/rag/paragraph/retry")
+                sync_retry_sent = True
+                return result
+
+        def submit(batch: list[uuid.UUID]) -> Optional[str]:
+            try:
+                return AduibJobService.submit(
+                    "rag_retry",
+                    "/v1/knowledge/rag/paragraph/retry",
+                    {"document_ids": [str(i) for i in batch]},
+                    fallback=sync_retry,
+                )
+            except Exception as e:
+                logger.error(f"Error during blog RAG Retry of {len(batch)} documents: {e}")
+                # let the next run retry them instead of waiting for the cooldown
+                BlogSyncService._release_rag_retries(batch)
+                return None
+
+        with ThreadPoolExecutor(max_workers=config.RAG_RETRY_CONCURRENCY, thread_name_prefix="rag_retry") as pool:
+            job_ids = [job_id for job_id in pool.map(submit, batches) if job_id]
+        logger.info(f"Requested RAG retry of {len(document_ids)} documents in {len(batches)} batches")
+        return job_ids
+
+    @staticmethod
+    @redis_fallback()
+    def _release_rag_retries(document_ids: list[uuid.UUID]):
+        redis_client.delete(*[BlogSyncService._RAG_RETRY_COOLDOWN_KEY.format(i) for i in document_ids])
+
+    # keyset cursor (last document id) and progress of the current knowledge cleanup pass
+    _CLEAN_CURSOR_KEY = "aduib_ai:knowledge_clean:cursor"
+    _CLEAN_PROGRESS_KEY = "aduib_ai:knowledge_clean:progress"
+    _CLEAN_LOCK_KEY = "aduib_ai:knowledge_clean:lock"
+    _release_lock_script = Script(redis_client, _RELEASE_LOCK_SCRIPT)
 
     @staticmethod
-    def clean_knowledge_documents():
+    def clean_knowledge_documents() -> int:
+        """
+        clean the knowledge documents incrementally
+
+        Every run sends up to KNOWLEDGE_CLEAN_SLICES_PER_RUN slices of KNOWLEDGE_CLEAN_SLICE_SIZE document ids,
+        in id order, to the cleanup endpoint. The last id is kept in redis, so the next run resumes the pass
+        where this one stopped. When the pass reaches the last document it starts over.
+        If AduibAI answers the sliced request with 404 / 405, the old full cleanup request is sent instead.
+
+        :return: number of documents sent for cleanup
+        """
         logger.info("Starting cleaning knowledge documents")
+        lock_token = BlogSyncService._claim_clean_lock()
+        if lock_token is None:
+            logger.info("Knowledge cleanup is already running or redis is unavailable, skipping this run")
+            return 0
         ai_client_ = get_aduib_ai_client()
+        clean_limit = TokenBucketLimit("aduib_ai:knowledge_clean", rate=config.KNOWLEDGE_CLEAN_RATE_LIMIT) \
+            if config.KNOWLEDGE_CLEAN_RATE_LIMIT > 0 else None
+        cleaned = 0
         try:
-            # Simulate synchronization process
-            logger.info(f"Cleaning knowledge documents")
-            result = ai_client_.get(path="/v1/knowledge/rag/paragraph/clean")
-            logger.info(f"Cleaning knowledge documents completed successfully, result: {result}")
+            cursor = redis_client.get(BlogSyncService._CLEAN_CURSOR_KEY)
+            cursor = uuid.UUID(cursor.decode("utf-8")) if cursor else None
+            if cursor is None:
+                BlogSyncService._start_clean_pass()
+            for _ in range(config.KNOWLEDGE_CLEAN_SLICES_PER_RUN):
+                with get_db() as session:
+                    query = session.query(KnowledgeDocument.id)
+                    if cursor is not None:
+                        query = query.filter(KnowledgeDocument.id > cursor)
+                    document_ids = [
+                        row.id for row in query.order_by(KnowledgeDocument.id).limit(config.KNOWLEDGE_CLEAN_SLICE_SIZE)
+                    ]
+                if not document_ids:
+                    BlogSyncService._finish_clean_pass()
+                    break
+                if clean_limit:
+                    clean_limit.acquire()
+                try:
+                    ai_client_.post(
+                        path="/v1/knowledge/rag/paragraph/clean",
+                        json={"document_ids": [str(i) for i in document_ids]},
+                    )
+                except (ResourceNotFoundError, MethodNotAllowedError) as e:
+                    # AduibAI has no sliced cleanup yet, the old request cleans every document at once
+                    logger.warning(f"AduibAI rejected the sliced cleanup ({e}), falling back to the full cleanup")
+                    result = ai_client_.get(path="/v1/knowledge/rag/paragraph/clean")
+                    logger.info(f"Cleaning knowledge documents completed successfully, result: {result}")
+                    BlogSyncService._finish_clean_pass()
+                    break
+                cursor = document_ids[-1]
+                cleaned += len(document_ids)
+                pipe = redis_client.pipeline(transaction=False)
+                pipe.set(BlogSyncService._CLEAN_CURSOR_KEY, str(cursor))
+                pipe.hincrby(BlogSyncService._CLEAN_PROGRESS_KEY, "processed", len(document_ids))
+                pipe.hgetall(BlogSyncService._CLEAN_PROGRESS_KEY)
+                progress = {k.decode("utf-8"): v.decode("utf-8") for k, v in pipe.execute()[-1].items()}
+                logger.info(
+                    f"Cleaned knowledge documents {progress.get('processed')}/{progress.get('total')} "
+                    f"of the pass started at {progress.get('started_at')}"
+                )
         except Exception as e:
-            logger.error(f"Error during cleaning knowledge documents: {e}")
\ No newline at end of file
+            logger.error(f"Error during cleaning knowledge documents, resuming from the last slice next run: {e}")
+        finally:
+            BlogSyncService._release_clean_lock(lock_token)
+        return cleaned
+
+    @staticmethod
+    @redis_fallback()
+    def _claim_clean_lock() -> Optional[str]:
+        """take the cleanup lock, returns the token needed to release it or None when it is held by another run"""
+        token = uuid.uuid4().hex
+        lock_ttl = config.ADUIB_SERVICE_TIMEOUT * config.KNOWLEDGE_CLEAN_SLICES_PER_RUN
+        if redis_client.set(BlogSyncService._CLEAN_LOCK_KEY, token, nx=True, ex=lock_ttl):
+            return token
+        return None
+
+    @staticmethod
+    @redis_fallback()
+    def _release_clean_lock(token: str):
+        BlogSyncService._release_lock_script(keys=[BlogSyncService._CLEAN_LOCK_KEY], args=[token])
+
+    @staticmethod
+    def _start_clean_pass():
+        with get_db() as session:
+            total = session.query(func.count(KnowledgeDocument.id)).scalar() or 0
+        redis_client.hset(
+            BlogSyncService._CLEAN_PROGRESS_KEY,
+            mapping={"started_at": datetime.now().isoformat(), "processed": 0, "total": total},
+        )
+
+    @staticmethod
+    def _finish_clean_pass():
+        progress = redis_client.hgetall(BlogSyncService._CLEAN_PROGRESS_KEY)
+        logger.info(
+            f"Knowledge cleanup pass finished, {int(progress.get(b'processed', 0))} documents cleaned"
+        )
+        redis_client.delete(BlogSyncService._CLEAN_CURSOR_KEY, BlogSyncService._CLEAN_PROGRESS_KEY)
@@ -0,0 +1,134 @@
+"""
+The two-tier @cached decorator against an in-memory fake redis.
+
+Skipped when fakeredis is not installed.
+"""
+import threading
+import time
+import uuid
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from component.cache.codec import JsonSerializer, PickleSerializer
+from component.cache.redis_cache import redis_client
+from component.cache.tiered_cache import _CACHE_KEY, _default_key, cached
+
+
+@pytest.fixture()
+def fake_redis():
+    client = fakeredis.FakeRedis()
+    previous = redis_client.swap(client)
+    try:
+        yield client
+    finally:
+        redis_client.swap(previous)
+
+
+def _name() -> str:
+    return f"test:{uuid.uuid4().hex}"
+
+
+def _wait_for(predicate, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached in time"
+        time.sleep(0.01)
+
+
+def test_concurrent_misses_load_once(fake_redis):
+    calls = []
+
+    @cached(ttl=60, name=_name())
+    def load(key: str) -> str:
+        calls.append(key)
+        time.sleep(0.2)
+        return key.upper()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(load("a"))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == ["a"]
+    assert results == ["A"] * 5
+    assert load.cache_stats.loads == 1
+
+
+def test_stale_hit_is_served_while_refreshing(fake_redis):
+    version = iter(range(1, 100))
+
+    @cached(ttl=60, soft_ttl=1, name=_name())
+    def load() -> int:
+        return next(version)
+
+    assert load() == 1
+    time.sleep(1.1)
+
+    # the stale value is returned at once, the reload runs in the background
+    assert load() == 1
+    assert load.cache_stats.stale_hits == 1
+    _wait_for(lambda: load.cache_stats.loads == 2)
+    assert load() == 2
+
+
+def test_local_entry_expires_with_the_redis_entry(fake_redis):
+    calls = []
+
+    @cached(ttl=1, local_ttl=30, name=_name())
+    def load() -> str:
+        calls.append(1)
+        return "value"
+
+    load()
+    # an empty local tier, as in another process, reads the entry from redis
+    load.cache_clear()
+    assert load() == "value"
+    assert load.cache_stats.redis_hits == 1
+
+    time.sleep(1.1)
+    load()
+    assert len(calls) == 2
+
+
+def test_serializer_defaults_to_the_codec_serializer(fake_redis):
+    name = _name()
+
+    @cached(ttl=60, local_ttl=None, name=name)
+    def load() -> dict:
+        return {"title": "hello", "tags": ["a", "b"]}
+
+    assert load() == {"title": "hello", "tags": ["a", "b"]}
+    raw = fake_redis.get(_CACHE_KEY.format(name, _default_key()))
+    assert raw[1] == JsonSerializer.id
+    assert load() == {"title": "hello", "tags": ["a", "b"]}
+    assert load.cache_stats.redis_hits == 1
+
+
+def test_pickle_keeps_python_types(fake_redis):
+    name = _name()
+
+    @cached(ttl=60, local_ttl=None, name=name, serializer="pickle")
+    def load() -> set:
+        return {1, 2}
+
+    load()
+    assert fake_redis.get(_CACHE_KEY.format(name, _default_key()))[1] == PickleSerializer.id
+    assert load() == {1, 2}
+    assert load.cache_stats.redis_hits == 1
+
+
+def test_unencodable_result_is_returned_without_caching_it_in_redis(fake_redis):
+    name = _name()
+
+    value = object()
+
+    @cached(ttl=60, local_ttl=None, name=name)
+    def load() -> object:
+        return value
+
+    assert load() is value
+    assert fake_redis.get(_CACHE_KEY.format(name, _default_key())) is None
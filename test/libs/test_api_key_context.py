@@ -0,0 +1,148 @@
+"""
+Concurrent request limit of ApiKeyContextMiddleware (API_KEY_MAX_ACTIVE_REQUESTS) against an in-memory fake redis.
+
+Skipped when fakeredis is not installed.
+"""
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from fastapi import FastAPI
+from starlette.responses import StreamingResponse
+
+from component.cache.redis_cache import async_redis_client
+from configs import config
+from libs.context import API_KEY_HEADER, ApiKeyContextMiddleware
+from service.api_key_service import ApiKeyService
+from service.error.error import ApiKeyNotFound
+
+
+@pytest.fixture()
+def server():
+    server = fakeredis.FakeServer()
+    previous = async_redis_client._factory
+    async_redis_client.swap(lambda: fakeredis.FakeAsyncRedis(server=server))
+    try:
+        yield server
+    finally:
+        async_redis_client.swap(previous)
+
+
+@pytest.fixture()
+def api_key(monkeypatch):
+    key = SimpleNamespace(id=uuid.uuid4().hex)
+
+    def validate(api_hash_key):
+        if api_hash_key != "valid":
+            raise ApiKeyNotFound("Api Key not correct")
+        return True
+
+    monkeypatch.setattr(ApiKeyService, "get_by_hash_key", staticmethod(lambda api_hash_key: key))
+    monkeypatch.setattr(ApiKeyService, "validate_api_key", staticmethod(validate))
+    monkeypatch.setattr(config, "API_KEY_MAX_ACTIVE_REQUESTS", 1)
+    monkeypatch.setattr(config, "API_KEY_RATE_LIMIT", 0)
+    monkeypatch.setattr(config, "API_KEY_USAGE_ENABLED", False)
+    return key
+
+
+def _in_flight(server, api_key) -> int:
+    return fakeredis.FakeRedis(server=server).zcard(f"aduib_ai:rate_limit:{{api_key:{api_key.id}}}:in_flight_requests")
+
+
+def _app(release: asyncio.Event) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ApiKeyContextMiddleware)
+
+    @app.get("/slow")
+    async def slow():
+        await release.wait()
+        return {"ok": True}
+
+    @app.get("/fast")
+    async def fast():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def body():
+            yield b"a"
+            await release.wait()
+            yield b"b"
+
+        return StreamingResponse(body())
+
+    @app.get("/fail")
+    async def fail():
+        raise RuntimeError("handler failed")
+
+    return app
+
+
+async def _wait_for(predicate, timeout: float = 5):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached in time"
+        await asyncio.sleep(0.01)
+
+
+def _client(app: FastAPI) -> httpx.AsyncClient:
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    return httpx.AsyncClient(transport=transport, base_url="http://test", headers={API_KEY_HEADER: "valid"})
+
+
+def test_requests_beyond_the_limit_are_rejected_until_a_slot_is_free(server, api_key):
+    async def run():
+        release = asyncio.Event()
+        async with _client(_app(release)) as client:
+            slow = asyncio.create_task(client.get("/slow"))
+            await _wait_for(lambda: _in_flight(server, api_key) == 1)
+
+            response = await client.get("/fast")
+            assert response.status_code == 429
+            assert response.json()["code"] == 429
+
+            release.set()
+            assert (await slow).status_code == 200
+            assert _in_flight(server, api_key) == 0
+            assert (await client.get("/fast")).status_code == 200
+
+    asyncio.run(run())
+
+
+def test_streamed_response_keeps_its_slot_until_the_body_is_sent(server, api_key):
+    async def run():
+        release = asyncio.Event()
+        async with _client(_app(release)) as client:
+            stream = asyncio.create_task(client.get("/stream"))
+            await _wait_for(lambda: _in_flight(server, api_key) == 1)
+            assert (await client.get("/fast")).status_code == 429
+
+            release.set()
+            assert (await stream).content == b"ab"
+            assert _in_flight(server, api_key) == 0
+
+    asyncio.run(run())
+
+
+def test_failed_request_releases_its_slot(server, api_key):
+    async def run():
+        async with _client(_app(asyncio.Event())) as client:
+            assert (await client.get("/fail")).status_code == 500
+            assert _in_flight(server, api_key) == 0
+            assert (await client.get("/fast")).status_code == 200
+
+    asyncio.run(run())
+
+
+def test_invalid_api_key_is_answered_with_403(server, api_key):
+    async def run():
+        async with _client(_app(asyncio.Event())) as client:
+            response = await client.get("/fast", headers={API_KEY_HEADER: "invalid"})
+            assert response.status_code == 403
+
+    asyncio.run(run())
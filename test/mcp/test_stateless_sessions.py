@@ -0,0 +1,122 @@
+"""
+Two app processes in stateless mode sharing their sessions through redis: a session initialized on one
+process is served and terminated by the other one.
+
+Needs a redis server at REDIS_HOST:REDIS_PORT (localhost:6379 by default), skipped otherwise.
+"""
+import multiprocessing
+import os
+import socket
+import time
+
+import httpx
+import pytest
+import redis
+
+REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+
+HEADERS = {"Accept": "application/json, text/event-stream", "Content-Type": "application/json"}
+SESSION_HEADER = "mcp-session-id"
+
+
+def _redis_available() -> bool:
+    try:
+        return redis.Redis(host=REDIS_HOST, port=REDIS_PORT, socket_connect_timeout=1).ping()
+    except redis.RedisError:
+        return False
+
+
+pytestmark = pytest.mark.skipif(not _redis_available(), reason="needs a redis server")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _serve(port: int):
+    import redis.asyncio
+    import uvicorn
+
+    from component.mcp.session_store import RedisSessionStore
+    from fast_mcp import FastMCP
+
+    store = RedisSessionStore(client=redis.asyncio.Redis(host=REDIS_HOST, port=REDIS_PORT), ttl=60)
+    mcp = FastMCP("stateless-test", session_store=store, stateless_http=True, json_response=True)
+
+    @mcp.tool()
+    def echo(text: str) -> str:
+        return text
+
+    uvicorn.run(mcp.streamable_http_app(), host="127.0.0.1", port=port, log_level="warning")
+
+
+def _wait_until_up(url: str, timeout: float = 20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise TimeoutError(f"{url} did not start")
+
+
+@pytest.fixture(scope="module")
+def nodes():
+    ctx = multiprocessing.get_context("spawn")
+    ports = [_free_port(), _free_port()]
+    processes = [ctx.Process(target=_serve, args=(port,), daemon=True) for port in ports]
+    for process in processes:
+        process.start()
+    urls = [f"http://127.0.0.1:{port}/mcp/" for port in ports]
+    try:
+        for url in urls:
+            _wait_until_up(url)
+        yield urls
+    finally:
+        for process in processes:
+            process.terminate()
+            process.join(5)
+
+
+def _rpc(url: str, method: str, session_id: str | None = None, params: dict | None = None, id: int | None = 1):
+    message = {"jsonrpc": "2.0", "method": method, "params": params or {}}
+    if id is not None:
+        message["id"] = id
+    headers = {**HEADERS, SESSION_HEADER: session_id} if session_id else HEADERS
+    return httpx.post(url, json=message, headers=headers, timeout=10)
+
+
+def test_session_is_shared_between_processes(nodes):
+    node_a, node_b = nodes
+    response = _rpc(
+        node_a,
+        "initialize",
+        params={
+            "protocolVersion": "2025-03-26",
+            "capabilities": {},
+            "clientInfo": {"name": "test", "version": "1.0"},
+        },
+    )
+    assert response.status_code == 200
+    session_id = response.headers[SESSION_HEADER]
+
+    assert _rpc(node_b, "notifications/initialized", session_id, id=None).status_code == 202
+
+    response = _rpc(node_b, "tools/call", session_id, {"name": "echo", "arguments": {"text": "hi"}}, id=2)
+    assert response.status_code == 200
+    assert response.json()["result"]["content"][0]["text"] == "hi"
+
+    response = _rpc(node_a, "tools/list", session_id, id=3)
+    assert [tool["name"] for tool in response.json()["result"]["tools"]] == ["echo"]
+
+    response = httpx.delete(node_b, headers={**HEADERS, SESSION_HEADER: session_id}, timeout=10)
+    assert response.status_code == 200
+    assert _rpc(node_a, "tools/list", session_id, id=4).status_code == 404
+
+
+def test_unknown_session_is_rejected(nodes):
+    assert _rpc(nodes[0], "tools/list", "0" * 32).status_code == 404
@@ -0,0 +1,66 @@
+import asyncio
+
+import anyio
+import pytest
+from mcp.server.fastmcp.exceptions import ToolError
+
+from fast_mcp import ToolLimiter, ToolLimits
+
+
+async def _call(limiter: ToolLimiter, client_id: str | None = None, duration: float = 0.05) -> str:
+    try:
+        async with limiter.limit(client_id):
+            await anyio.sleep(duration)
+        return "ok"
+    except ToolError as e:
+        return "timeout" if "timed out" in str(e) else "rejected"
+
+
+async def _gather(*calls):
+    return list(await asyncio.gather(*calls))
+
+
+def test_queued_call_is_admitted_and_next_one_rejected():
+    limiter = ToolLimiter("t", ToolLimits(max_concurrency=1, max_queue=1))
+
+    results = asyncio.run(_gather(_call(limiter), _call(limiter), _call(limiter)))
+
+    assert results == ["ok", "ok", "rejected"]
+    assert limiter.stats() == {"active": 0, "queued": 0, "rejected": 1, "timed_out": 0}
+
+
+def test_call_without_queue_is_rejected_while_slots_are_taken():
+    limiter = ToolLimiter("t", ToolLimits(max_concurrency=2))
+
+    results = asyncio.run(_gather(_call(limiter), _call(limiter), _call(limiter)))
+
+    assert results == ["ok", "ok", "rejected"]
+
+
+def test_per_client_limit_leaves_no_counters_behind():
+    limiter = ToolLimiter("t", ToolLimits(max_concurrency=1, max_queue=0, max_concurrency_per_client=1))
+
+    results = asyncio.run(_gather(_call(limiter, "a"), _call(limiter, "a"), _call(limiter, "b")))
+
+    assert results == ["ok", "rejected", "rejected"]
+    assert limiter._client_calls == {}
+
+
+def test_timeout_releases_the_slot():
+    limiter = ToolLimiter("t", ToolLimits(max_concurrency=1, timeout=0.01))
+
+    async def run():
+        first = await _call(limiter, duration=1)
+        second = await _call(limiter, duration=0)
+        return [first, second]
+
+    assert asyncio.run(run()) == ["timeout", "ok"]
+    assert limiter.stats()["timed_out"] == 1
+    assert limiter.stats()["active"] == 0
+
+
+@pytest.mark.parametrize("max_queue", [0, 2])
+def test_unlimited_concurrency_admits_every_call(max_queue):
+    limiter = ToolLimiter("t", ToolLimits(max_queue=max_queue))
+
+    assert asyncio.run(_gather(*(_call(limiter) for _ in range(5)))) == ["ok"] * 5
@@ -0,0 +1,142 @@
+"""
+app.py serving the stateless MCP endpoint with two uvicorn worker processes (APP_MAX_WORKERS=2).
+
+The Nacos tool metadata sync of the workers needs nacos_mcp and its wrapper, that test is skipped when they
+can not be imported.
+"""
+import asyncio
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+import app
+from configs import config
+
+ROOT = Path(__file__).resolve().parents[2]
+HEADERS = {"Accept": "application/json, text/event-stream", "Content-Type": "application/json"}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _rpc(url: str, method: str, params: dict | None = None, id: int = 1):
+    message = {"jsonrpc": "2.0", "method": method, "params": params or {}, "id": id}
+    return httpx.post(url, json=message, headers=HEADERS, timeout=10)
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    port = _free_port()
+    app_home = tmp_path_factory.mktemp("workers")
+    env = {
+        **os.environ,
+        "APP_HOME": str(app_home),
+        "APP_HOST": "127.0.0.1",
+        "APP_PORT": str(port),
+        "APP_MAX_WORKERS": "2",
+        "TRANSPORT_TYPE": "streamable-http",
+        "MCP_STATELESS_HTTP": "true",
+        "DISCOVERY_SERVICE_ENABLED": "false",
+        "AUTH_ENABLED": "false",
+        "DEBUG": "false",
+    }
+    log_path = app_home / "app.log"
+    with open(log_path, "wb") as log:
+        process = subprocess.Popen([sys.executable, "app.py"], cwd=ROOT, env=env, stdout=log, stderr=log)
+    url = f"http://127.0.0.1:{port}/mcp/"
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            assert process.poll() is None, log_path.read_text(errors="replace")
+            assert time.monotonic() < deadline, "app did not start"
+            try:
+                httpx.get(url, timeout=1)
+                break
+            except httpx.TransportError:
+                time.sleep(0.5)
+        yield url, log_path
+    finally:
+        process.terminate()
+        process.wait(20)
+
+
+def test_two_workers_serve_the_stateless_endpoint(server):
+    url, log_path = server
+
+    for i in range(10):
+        response = _rpc(url, "tools/list", id=i)
+        assert response.status_code == 200
+        assert '"tools"' in response.text
+
+    # uvicorn logs the start of every worker process
+    deadline = time.monotonic() + 30
+    while len(set(re.findall(r"Started server process \[(\d+)\]", log_path.read_text(errors="replace")))) < 2:
+        assert time.monotonic() < deadline, log_path.read_text(errors="replace")
+        time.sleep(0.5)
+
+
+@pytest.mark.parametrize(
+    "workers, transport, stateless, expected",
+    [
+        (4, "streamable-http", True, 4),
+        (4, "streamable-http", False, 1),
+        (4, "sse", True, 1),
+        (1, "streamable-http", True, 1),
+        (0, "streamable-http", True, 1),
+    ],
+)
+def test_worker_count(monkeypatch, workers, transport, stateless, expected):
+    monkeypatch.setattr(config, "APP_MAX_WORKERS", workers)
+    monkeypatch.setattr(config, "TRANSPORT_TYPE", transport)
+    monkeypatch.setattr(config, "MCP_STATELESS_HTTP", stateless)
+    assert app._worker_count() == expected
+
+
+def test_worker_follows_the_tool_metadata_in_nacos(monkeypatch):
+    nacos_mcp = pytest.importorskip("nacos_mcp")
+    from nacos_mcp_wrapper.server.nacos_settings import NacosSettings
+
+    mcp = nacos_mcp.NacosMCP("worker-test", nacos_settings=NacosSettings(SERVER_ADDR="127.0.0.1:8848"))
+
+    @mcp.tool(description="local description")
+    def echo(text: str) -> str:
+        return text
+
+    @mcp.tool()
+    def hidden(text: str) -> str:
+        return text
+
+    tools = [SimpleNamespace(name="echo", description="nacos description", inputSchema={"properties": {}})]
+    detail = SimpleNamespace(
+        toolSpec=SimpleNamespace(tools=tools, toolsMeta={"hidden": SimpleNamespace(enabled=False)})
+    )
+
+    class FakeMcpService:
+        async def get_mcp_server_detail(self, namespace, name, version):
+            return detail
+
+    async def create_mcp_service(client_config):
+        return FakeMcpService()
+
+    monkeypatch.setattr(nacos_mcp.NacosAIMaintainerService, "create_mcp_service", create_mcp_service)
+
+    async def run():
+        await mcp.sync_tools()
+        try:
+            return await mcp._mcp_server._list_tmp_tools()
+        finally:
+            mcp._tools_sync_task.cancel()
+
+    listed = asyncio.run(run())
+    assert [(tool.name, tool.description) for tool in listed] == [("echo", "nacos description")]
@@ -0,0 +1,89 @@
+"""
+ApiKeyUsageService counters against an in-memory fake redis, the database write is replaced by a list.
+
+Skipped when fakeredis is not installed.
+"""
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from component.cache.redis_cache import redis_client
+from configs import config
+from service.api_key_usage_service import ApiKeyUsageService
+
+
+@pytest.fixture()
+def fake_redis():
+    client = fakeredis.FakeRedis()
+    previous = redis_client.swap(client)
+    try:
+        yield client
+    finally:
+        redis_client.swap(previous)
+
+
+@pytest.fixture()
+def saved(monkeypatch):
+    """counters passed to _save, keyed by (api key id, bucket)"""
+    rows: dict[tuple[int, int], dict[str, int]] = {}
+
+    def save(counters):
+        for usage_key, values in counters.items():
+            api_key_id, bucket = usage_key.rsplit(":", 2)[-2:]
+            row = rows.setdefault((int(api_key_id), int(bucket)), dict.fromkeys(values, 0))
+            for field, value in values.items():
+                row[field] += value
+
+    monkeypatch.setattr(config, "DB_ENABLED", True)
+    monkeypatch.setattr(config, "API_KEY_USAGE_BUCKET_SECONDS", 60)
+    monkeypatch.setattr(ApiKeyUsageService, "_save", staticmethod(save))
+    return rows
+
+
+def _totals(rows) -> dict[int, dict[str, int]]:
+    totals: dict[int, dict[str, int]] = {}
+    for (api_key_id, _), values in rows.items():
+        total = totals.setdefault(api_key_id, dict.fromkeys(values, 0))
+        for field, value in values.items():
+            total[field] += value
+    return totals
+
+
+def test_flush_moves_recorded_usage_to_the_database(fake_redis, saved):
+    ApiKeyUsageService.record(1, 100, 200, 10)
+    ApiKeyUsageService.record(1, 50, 0, 30)
+    ApiKeyUsageService.record(2, 10, 20, 5)
+
+    assert ApiKeyUsageService.flush() >= 2
+    assert _totals(saved) == {
+        1: {"request_count": 2, "request_bytes": 150, "response_bytes": 200, "latency_ms": 40},
+        2: {"request_count": 1, "request_bytes": 10, "response_bytes": 20, "latency_ms": 5},
+    }
+    assert fake_redis.keys("aduib_ai:usage:*") == []
+
+
+def test_failed_save_restores_the_counters(fake_redis, saved, monkeypatch):
+    ApiKeyUsageService.record(1, 100, 200, 10)
+    save = ApiKeyUsageService._save
+
+    def fail(counters):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(ApiKeyUsageService, "_save", staticmethod(fail))
+    with pytest.raises(RuntimeError):
+        ApiKeyUsageService.flush()
+    # an increment after the failed flush is merged with the restored counters
+    ApiKeyUsageService.record(1, 1, 2, 3)
+
+    monkeypatch.setattr(ApiKeyUsageService, "_save", staticmethod(save))
+    ApiKeyUsageService.flush()
+    assert _totals(saved) == {1: {"request_count": 2, "request_bytes": 101, "response_bytes": 202, "latency_ms": 13}}
+
+
+def test_flush_keeps_the_counters_without_database(fake_redis, saved, monkeypatch):
+    monkeypatch.setattr(config, "DB_ENABLED", False)
+    ApiKeyUsageService.record(1, 100, 200, 10)
+
+    assert ApiKeyUsageService.flush() == 0
+    assert saved == {}
+    assert fake_redis.scard(ApiKeyUsageService._PENDING_USAGE_KEY) == 1
@@ -7,7 +7,8 @@ from .module_import_helper import (
     import_module_from_source,
 )
 from .net import get_local_ip
-from .rate_limit import RateLimit
+from .rate_limit import RateLimit, AsyncRateLimit
+from .throughput_limit import ThroughputLimit, TokenBucketLimit, SlidingWindowLimit
 from .uuid import random_uuid, message_uuid, trace_uuid, generate_string
 from .yaml_utils import load_yaml_file, load_yaml_files
 
@@ -22,6 +23,10 @@ __all__ = [
     "generate_string",
     "jsonable_encoder",
     "RateLimit",
+    "AsyncRateLimit",
+    "ThroughputLimit",
+    "TokenBucketLimit",
+    "SlidingWindowLimit",
     "load_yaml_file",
     "load_yaml_files",
     "get_subclasses_from_module",
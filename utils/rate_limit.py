@@ -1,20 +1,152 @@
 import logging
+import math
+import threading
 import time
 import uuid
-from collections.abc import Generator, Mapping
+from collections.abc import AsyncGenerator, Generator, Mapping
 from datetime import timedelta
 from typing import Any, Optional, Union
-from component.cache.redis_cache import redis_client
+
+from redis.commands.core import AsyncScript, Script
+
+from component.cache.redis_batch import AsyncRedisBatch, RedisBatch
+from component.cache.redis_cache import async_redis_client, redis_client, redis_fallback
 
 logger = logging.getLogger(__name__)
 
+# Scripts are kept as bytes so they can be bound to the (possibly not yet initialized) client wrappers;
+# every call then goes through the wrapper and follows it when the underlying client changes.
+
+# KEYS[1]: in-flight requests sorted set (member: request id, score: start time)
+# ARGV: request_id, now, max_active_requests, key ttl, request max alive time
+_ENTER_SCRIPT = b"""
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', '(' .. (tonumber(ARGV[2]) - tonumber(ARGV[5])))
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+# KEYS[1]: max active requests key, KEYS[2]: in-flight requests sorted set
+# ARGV: local max_active_requests, use_local_value (1/0), key ttl, now, request max alive time
+_FLUSH_SCRIPT = b"""
+local max_active_requests = ARGV[1]
+if ARGV[2] == '1' or redis.call('EXISTS', KEYS[1]) == 0 then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+else
+    max_active_requests = redis.call('GET', KEYS[1])
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', '(' .. (tonumber(ARGV[4]) - tonumber(ARGV[5])))
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return max_active_requests
+"""
+
+
+# processes of this node admitting requests against the same limits, they split the limit while redis is down
+_serving_processes = 1
+
+
+def set_serving_processes(count: int):
+    """number of processes of this node sharing the rate limits, set by the server or worker starting them"""
+    global _serving_processes
+    _serving_processes = max(int(count), 1)
+
+
+class LocalRateLimit:
+    """
+    In-process approximation of a client's limit, used while redis is unavailable.
+
+    Each process admits its share of the global limit (``max_active_requests`` split over the processes serving
+    on this node, see ``set_serving_processes``), so the service keeps limiting instead of failing open. After a redis error, redis is skipped
+    for ``_REDIS_RETRY_INTERVAL`` seconds so requests do not wait on a dead connection each time.
+    """
+    _REDIS_RETRY_INTERVAL = 5
+
+    def __init__(self, client_id: str, max_active_requests: int):
+        self.client_id = client_id
+        self.max_active_requests = max_active_requests
+        self.requests: dict[str, float] = {}
+        self.redis_retry_time = float("-inf")
+        self.lock = threading.Lock()
+
+    @property
+    def max_local_requests(self) -> int:
+        return max(1, math.ceil(self.max_active_requests / _serving_processes))
+
+    def redis_available(self) -> bool:
+        return time.monotonic() >= self.redis_retry_time
+
+    def mark_redis_unavailable(self):
+        self.redis_retry_time = time.monotonic() + self._REDIS_RETRY_INTERVAL
+
+    def enter(self, request_id: str) -> str:
+        now = time.time()
+        with self.lock:
+            for timeout_request_id in [
+                k for k, v in self.requests.items() if now - v > RateLimit._REQUEST_MAX_ALIVE_TIME
+            ]:
+                del self.requests[timeout_request_id]
+            if len(self.requests) >= self.max_local_requests:
+                raise ValueError(
+                    f"Too many requests. Please try again later. The current maximum concurrent requests allowed "
+                    f"for {self.client_id} is {self.max_local_requests} (local limit, redis unavailable)."
+                )
+            self.requests[request_id] = now
+        return request_id
+
+    def exit(self, request_id: str) -> bool:
+        """release a locally admitted request, False if the request was admitted by redis"""
+        with self.lock:
+            return self.requests.pop(request_id, None) is not None
 
-class RateLimit:
-    _MAX_ACTIVE_REQUESTS_KEY = "aduib_ai:rate_limit:{}:max_active_requests"
-    _ACTIVE_REQUESTS_KEY = "aduib_ai:rate_limit:{}:active_requests"
+    def snapshot(self) -> dict[str, float]:
+        with self.lock:
+            return dict(self.requests)
+
+    def discard(self, request_ids) -> list[str]:
+        """
+        forget requests handed over to redis, returns the ones that exited while they were pushed.
+        their exit only released the local entry, so the caller removes them from redis again.
+        """
+        with self.lock:
+            return [request_id for request_id in request_ids if self.requests.pop(request_id, None) is None]
+
+
+class _BaseRateLimit:
+    """keys, limits and the redis outage handling shared by ``RateLimit`` and ``AsyncRateLimit``"""
+    # the client id is a hash tag, so both keys of a client live in one cluster slot and can be used by one script
+    _MAX_ACTIVE_REQUESTS_KEY = "aduib_ai:rate_limit:{{{}}}:max_active_requests"
+    # sorted set of in-flight requests scored by start time (the former hash layout used ":active_requests")
+    _ACTIVE_REQUESTS_KEY = "aduib_ai:rate_limit:{{{}}}:in_flight_requests"
     _UNLIMITED_REQUEST_ID = "unlimited_request_id"
     _REQUEST_MAX_ALIVE_TIME = 10 * 60  # 10 minutes
-    _ACTIVE_REQUESTS_COUNT_FLUSH_INTERVAL = 5 * 60  # recalculate request_count from request_detail every 5 minutes
+    _ACTIVE_REQUESTS_COUNT_FLUSH_INTERVAL = 5 * 60  # sync max_active_requests from redis every 5 minutes
+    _KEY_EXPIRE_TIME = timedelta(days=1)
+
+    max_active_requests: int
+    local_limit: LocalRateLimit
+
+    def _on_redis_error(self, *args, **kwargs):
+        self.local_limit.mark_redis_unavailable()
+
+    def _enter_on_redis_error(self, request_id: Optional[str] = None) -> str:
+        self.local_limit.mark_redis_unavailable()
+        return self.local_limit.enter(request_id or self.gen_request_key())
+
+    def disabled(self):
+        return self.max_active_requests <= 0
+
+    @staticmethod
+    def gen_request_key() -> str:
+        return str(uuid.uuid4())
+
+
+class RateLimit(_BaseRateLimit):
+    _enter_script = Script(redis_client, _ENTER_SCRIPT)
+    _flush_script = Script(redis_client, _FLUSH_SCRIPT)
     _instance_dict: dict[str, "RateLimit"] = {}
 
     def __new__(cls: type["RateLimit"], client_id: str, max_active_requests: int):
@@ -35,60 +167,89 @@ class RateLimit:
         self.active_requests_key = self._ACTIVE_REQUESTS_KEY.format(client_id)
         self.max_active_requests_key = self._MAX_ACTIVE_REQUESTS_KEY.format(client_id)
         self.last_recalculate_time = float("-inf")
+        self.local_limit = LocalRateLimit(client_id, max_active_requests)
         self.flush_cache(use_local_value=True)
 
+    @redis_fallback(fallback=_BaseRateLimit._on_redis_error)
     def flush_cache(self, use_local_value=False):
         if self.disabled():
             return
         self.last_recalculate_time = time.time()
-        # flush max active requests
-        if use_local_value or not redis_client.exists(self.max_active_requests_key):
-            redis_client.setex(self.max_active_requests_key, timedelta(days=1), self.max_active_requests)
-        else:
-            self.max_active_requests = int(redis_client.get(self.max_active_requests_key).decode("utf-8"))
-            redis_client.expire(self.max_active_requests_key, timedelta(days=1))
-
-        # flush max active requests (in-transit request list)
-        if not redis_client.exists(self.active_requests_key):
-            return
-        request_details = redis_client.hgetall(self.active_requests_key)
-        redis_client.expire(self.active_requests_key, timedelta(days=1))
-        timeout_requests = [
-            k
-            for k, v in request_details.items()
-            if time.time() - float(v.decode("utf-8")) > RateLimit._REQUEST_MAX_ALIVE_TIME
-        ]
-        if timeout_requests:
-            redis_client.hdel(self.active_requests_key, *timeout_requests)
+        # sync max active requests and evict timed out in-flight requests in one round trip
+        max_active_requests = self._flush_script(
+            keys=[self.max_active_requests_key, self.active_requests_key],
+            args=[
+                self.max_active_requests,
+                1 if use_local_value else 0,
+                int(self._KEY_EXPIRE_TIME.total_seconds()),
+                time.time(),
+                RateLimit._REQUEST_MAX_ALIVE_TIME,
+            ],
+        )
+        self.max_active_requests = self.local_limit.max_active_requests = int(max_active_requests)
 
     def enter(self, request_id: Optional[str] = None) -> str:
         if self.disabled():
             return RateLimit._UNLIMITED_REQUEST_ID
-        if time.time() - self.last_recalculate_time > RateLimit._ACTIVE_REQUESTS_COUNT_FLUSH_INTERVAL:
-            self.flush_cache()
         if not request_id:
             request_id = RateLimit.gen_request_key()
+        if not self.local_limit.redis_available():
+            return self.local_limit.enter(request_id)
+        return self._enter(request_id)
+
+    @redis_fallback(fallback=_BaseRateLimit._enter_on_redis_error)
+    def _enter(self, request_id: str) -> str:
+        if self.local_limit.requests:
+            self._resync()
+        if time.time() - self.last_recalculate_time > RateLimit._ACTIVE_REQUESTS_COUNT_FLUSH_INTERVAL:
+            self.flush_cache()
+            if not self.local_limit.redis_available():
+                return self.local_limit.enter(request_id)
 
-        active_requests_count = redis_client.hlen(self.active_requests_key)
-        if active_requests_count >= self.max_active_requests:
+        # evict, check and acquire atomically, concurrent callers can not both take the last slot
+        acquired = self._enter_script(
+            keys=[self.active_requests_key],
+            args=[
+                request_id,
+                time.time(),
+                self.max_active_requests,
+                int(self._KEY_EXPIRE_TIME.total_seconds()),
+                RateLimit._REQUEST_MAX_ALIVE_TIME,
+            ],
+        )
+        if not acquired:
             raise ValueError(
                 f"Too many requests. Please try again later. The current maximum concurrent requests allowed "
                 f"for {self.client_id} is {self.max_active_requests}."
             )
-        redis_client.hset(self.active_requests_key, request_id, str(time.time()))
         return request_id
 
+    def _resync(self):
+        """hand the requests admitted locally during a redis outage over to redis, so they count globally again"""
+        requests = self.local_limit.snapshot()
+        if requests:
+            RedisBatch().zadd(self.active_requests_key, requests).expire(
+                self.active_requests_key, self._KEY_EXPIRE_TIME
+            ).execute()
+            exited = self.local_limit.discard(requests)
+            if exited:
+                redis_client.zrem(self.active_requests_key, *exited)
+        # redis may have missed updates of max_active_requests while it was unreachable
+        self.last_recalculate_time = float("-inf")
+
     def exit(self, request_id: str):
         if request_id == RateLimit._UNLIMITED_REQUEST_ID:
             return
-        redis_client.hdel(self.active_requests_key, request_id)
-
-    def disabled(self):
-        return self.max_active_requests <= 0
+        if self.local_limit.exit(request_id):
+            return
+        # while redis is unavailable the entry is left to the max alive time eviction
+        if self.local_limit.redis_available():
+            self._exit(request_id)
 
-    @staticmethod
-    def gen_request_key() -> str:
-        return str(uuid.uuid4())
+    @redis_fallback(fallback=_BaseRateLimit._on_redis_error)
+    def _exit(self, request_id: str):
+        # a single ZREM is already atomic, no script needed
+        redis_client.zrem(self.active_requests_key, request_id)
 
     def generate(self, generator: Union[Generator[str, None, None], Mapping[str, Any]], request_id: str):
         if isinstance(generator, Generator):
@@ -122,3 +283,147 @@ class RateLimitGenerator:
             self.rate_limit.exit(self.request_id)
             if self.generator is not None and hasattr(self.generator, "close"):
                 self.generator.close()
+
+
+class AsyncRateLimit(_BaseRateLimit):
+    """
+    asyncio counterpart of ``RateLimit`` built on ``async_redis_client``, which keeps one client per event loop.
+
+    It uses the same keys and scripts as ``RateLimit``, so sync and async callers of one client id share one limit,
+    and falls back to the same ``LocalRateLimit`` while redis is unavailable.
+    """
+    _enter_script = AsyncScript(async_redis_client, _ENTER_SCRIPT)
+    _flush_script = AsyncScript(async_redis_client, _FLUSH_SCRIPT)
+    _instance_dict: dict[str, "AsyncRateLimit"] = {}
+
+    def __new__(cls: type["AsyncRateLimit"], client_id: str, max_active_requests: int):
+        if client_id not in cls._instance_dict:
+            instance = super().__new__(cls)
+            cls._instance_dict[client_id] = instance
+        return cls._instance_dict[client_id]
+
+    def __init__(self, client_id: str, max_active_requests: int):
+        self.max_active_requests = max_active_requests
+        if self.disabled():
+            return
+        if hasattr(self, "initialized"):
+            return
+        self.initialized = True
+        self.client_id = client_id
+        self.active_requests_key = self._ACTIVE_REQUESTS_KEY.format(client_id)
+        self.max_active_requests_key = self._MAX_ACTIVE_REQUESTS_KEY.format(client_id)
+        self.last_recalculate_time = float("-inf")
+        self.local_limit = LocalRateLimit(client_id, max_active_requests)
+        # redis can not be awaited here, the local value is published on the first enter
+        self.synced = False
+
+    @redis_fallback(fallback=_BaseRateLimit._on_redis_error)
+    async def flush_cache(self, use_local_value=False):
+        if self.disabled():
+            return
+        self.last_recalculate_time = time.time()
+        max_active_requests = await self._flush_script(
+            keys=[self.max_active_requests_key, self.active_requests_key],
+            args=[
+                self.max_active_requests,
+                1 if use_local_value else 0,
+                int(self._KEY_EXPIRE_TIME.total_seconds()),
+                time.time(),
+                self._REQUEST_MAX_ALIVE_TIME,
+            ],
+        )
+        self.max_active_requests = self.local_limit.max_active_requests = int(max_active_requests)
+        self.synced = True
+
+    async def enter(self, request_id: Optional[str] = None) -> str:
+        if self.disabled():
+            return self._UNLIMITED_REQUEST_ID
+        if not request_id:
+            request_id = self.gen_request_key()
+        if not self.local_limit.redis_available():
+            return self.local_limit.enter(request_id)
+        return await self._enter(request_id)
+
+    @redis_fallback(fallback=_BaseRateLimit._enter_on_redis_error)
+    async def _enter(self, request_id: str) -> str:
+        if self.local_limit.requests:
+            await self._resync()
+        if not self.synced:
+            await self.flush_cache(use_local_value=True)
+        elif time.time() - self.last_recalculate_time > self._ACTIVE_REQUESTS_COUNT_FLUSH_INTERVAL:
+            await self.flush_cache()
+        if not self.local_limit.redis_available():
+            return self.local_limit.enter(request_id)
+
+        acquired = await self._enter_script(
+            keys=[self.active_requests_key],
+            args=[
+                request_id,
+                time.time(),
+                self.max_active_requests,
+                int(self._KEY_EXPIRE_TIME.total_seconds()),
+                self._REQUEST_MAX_ALIVE_TIME,
+            ],
+        )
+        if not acquired:
+            raise ValueError(
+                f"Too many requests. Please try again later. The current maximum concurrent requests allowed "
+                f"for {self.client_id} is {self.max_active_requests}."
+            )
+        return request_id
+
+    async def _resync(self):
+        requests = self.local_limit.snapshot()
+        if requests:
+            await AsyncRedisBatch().zadd(self.active_requests_key, requests).expire(
+                self.active_requests_key, self._KEY_EXPIRE_TIME
+            ).execute()
+            exited = self.local_limit.discard(requests)
+            if exited:
+                await async_redis_client.zrem(self.active_requests_key, *exited)
+        self.last_recalculate_time = float("-inf")
+
+    async def exit(self, request_id: str):
+        if request_id == self._UNLIMITED_REQUEST_ID:
+            return
+        if self.local_limit.exit(request_id):
+            return
+        if self.local_limit.redis_available():
+            await self._exit(request_id)
+
+    @redis_fallback(fallback=_BaseRateLimit._on_redis_error)
+    async def _exit(self, request_id: str):
+        await async_redis_client.zrem(self.active_requests_key, request_id)
+
+    def generate(self, generator: Union[AsyncGenerator[str, None], Mapping[str, Any]], request_id: str):
+        if isinstance(generator, AsyncGenerator):
+            return AsyncRateLimitGenerator(rate_limit=self, generator=generator, request_id=request_id)
+        else:
+            return generator
+
+
+class AsyncRateLimitGenerator:
+    def __init__(self, rate_limit: AsyncRateLimit, generator: AsyncGenerator[str, None], request_id: str):
+        self.rate_limit = rate_limit
+        self.generator = generator
+        self.request_id = request_id
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.closed:
+            raise StopAsyncIteration
+        try:
+            return await self.generator.__anext__()
+        except Exception:
+            await self.aclose()
+            raise
+
+    async def aclose(self):
+        if not self.closed:
+            self.closed = True
+            await self.rate_limit.exit(self.request_id)
+            if self.generator is not None and hasattr(self.generator, "aclose"):
+                await self.generator.aclose()
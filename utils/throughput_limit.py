@@ -0,0 +1,182 @@
+import logging
+import time
+import uuid
+from typing import Optional
+
+from redis.commands.core import AsyncScript, Script
+
+from component.cache.redis_cache import async_redis_client, redis_client
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1]: bucket hash (tokens, ts)
+# ARGV: refill rate (permits per second), capacity, now, requested permits, key ttl
+# returns {allowed (1/0), seconds to wait until the permits are available}
+_TOKEN_BUCKET_SCRIPT = b"""
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local requested = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil or ts == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+    allowed = 1
+else
+    wait = (requested - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return {allowed, tostring(wait)}
+"""
+
+# KEYS[1]: window sorted set (member: permit id, score: acquire time)
+# ARGV: limit, window seconds, now, requested permits, permit id prefix
+# returns {allowed (1/0), seconds to wait until the permits are available}
+_SLIDING_WINDOW_SCRIPT = b"""
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local requested = tonumber(ARGV[4])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+if count + requested <= limit then
+    for i = 1, requested do
+        redis.call('ZADD', KEYS[1], ARGV[3], ARGV[5] .. ':' .. i)
+    end
+    redis.call('EXPIRE', KEYS[1], math.ceil(window))
+    return {1, '0'}
+end
+local oldest = redis.call('ZRANGE', KEYS[1], count + requested - limit - 1, count + requested - limit - 1, 'WITHSCORES')
+return {0, tostring(tonumber(oldest[2]) + window - now)}
+"""
+
+
+class ThroughputLimit:
+    """
+    Distributed throughput limiter shared by all workers through redis.
+
+    Unlike ``RateLimit``, which caps the number of concurrent requests, a throughput limit caps how many
+    permits are handed out over time. ``name`` scopes the limit, e.g. ``api_key:<id>`` or ``halo:push``.
+    """
+    _KEY = "aduib_ai:throughput_limit:{}:{{{}}}"
+    _kind = ""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.key = self._KEY.format(self._kind, name)
+
+    def try_acquire(self, permits: int = 1) -> bool:
+        """acquire the permits if they are available right now, never waits"""
+        return self.acquire(permits, blocking=False)
+
+    def acquire(self, permits: int = 1, blocking: bool = True, timeout: Optional[float] = None) -> bool:
+        """
+        acquire permits
+
+        :param permits: number of permits to take
+        :param blocking: wait until the permits are available instead of failing immediately
+        :param timeout: maximum seconds to wait when blocking, None waits forever
+        :return: True if the permits were acquired
+        """
+        self._check_permits(permits)
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            allowed, wait = self._try_acquire(permits)
+            if allowed:
+                return True
+            if not blocking:
+                return False
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or wait > remaining:
+                    return False
+            logger.debug(f"Throughput limit {self.key} reached, waiting {wait:.3f}s")
+            time.sleep(wait)
+
+    async def async_try_acquire(self, permits: int = 1) -> bool:
+        """asyncio counterpart of ``try_acquire`` on ``async_redis_client``, never waits"""
+        self._check_permits(permits)
+        allowed, _ = await self._async_try_acquire(permits)
+        return allowed
+
+    def _check_permits(self, permits: int):
+        raise NotImplementedError
+
+    def _try_acquire(self, permits: int) -> tuple[bool, float]:
+        raise NotImplementedError
+
+    async def _async_try_acquire(self, permits: int) -> tuple[bool, float]:
+        raise NotImplementedError
+
+
+class TokenBucketLimit(ThroughputLimit):
+    """
+    Token bucket: refills ``rate`` permits every ``per`` seconds and allows bursts of up to ``capacity`` permits.
+    """
+    _kind = "token_bucket"
+    _script = Script(redis_client, _TOKEN_BUCKET_SCRIPT)
+    _async_script = AsyncScript(async_redis_client, _TOKEN_BUCKET_SCRIPT)
+
+    def __init__(self, name: str, rate: float, per: float = 1.0, capacity: Optional[int] = None):
+        if rate <= 0 or per <= 0:
+            raise ValueError("rate and per must be positive")
+        super().__init__(name)
+        self.rate = rate / per
+        self.capacity = capacity or max(int(rate), 1)
+        # an idle bucket is full again after capacity / rate seconds, keep the state a little longer
+        self.expire_time = max(int(self.capacity / self.rate) * 2, 1)
+
+    def _check_permits(self, permits: int):
+        if permits <= 0 or permits > self.capacity:
+            raise ValueError(f"permits must be between 1 and the bucket capacity {self.capacity}")
+
+    def _try_acquire(self, permits: int) -> tuple[bool, float]:
+        allowed, wait = self._script(keys=[self.key], args=self._script_args(permits))
+        return bool(allowed), float(wait)
+
+    async def _async_try_acquire(self, permits: int) -> tuple[bool, float]:
+        allowed, wait = await self._async_script(keys=[self.key], args=self._script_args(permits))
+        return bool(allowed), float(wait)
+
+    def _script_args(self, permits: int) -> list:
+        return [self.rate, self.capacity, time.time(), permits, self.expire_time]
+
+
+class SlidingWindowLimit(ThroughputLimit):
+    """
+    Sliding window log: at most ``limit`` permits in any ``window`` seconds.
+    """
+    _kind = "sliding_window"
+    _script = Script(redis_client, _SLIDING_WINDOW_SCRIPT)
+    _async_script = AsyncScript(async_redis_client, _SLIDING_WINDOW_SCRIPT)
+
+    def __init__(self, name: str, limit: int, window: float):
+        if limit <= 0 or window <= 0:
+            raise ValueError("limit and window must be positive")
+        super().__init__(name)
+        self.limit = limit
+        self.window = window
+
+    def _check_permits(self, permits: int):
+        if permits <= 0 or permits > self.limit:
+            raise ValueError(f"permits must be between 1 and the window limit {self.limit}")
+
+    def _try_acquire(self, permits: int) -> tuple[bool, float]:
+        allowed, wait = self._script(keys=[self.key], args=self._script_args(permits))
+        return bool(allowed), float(wait)
+
+    async def _async_try_acquire(self, permits: int) -> tuple[bool, float]:
+        allowed, wait = await self._async_script(keys=[self.key], args=self._script_args(permits))
+        return bool(allowed), float(wait)
+
+    def _script_args(self, permits: int) -> list:
+        return [self.limit, self.window, time.time(), permits, uuid.uuid4().hex]